@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, Any
+from auth import get_current_admin_user
+from indexes import index_usage_report
+from stats_repository import book_stats_repository
+from repository import book_repository
+from catalog_cache import catalog_cache
+from user_cache import user_cache
+from user_repository import user_repository
+from password_utils import password_hasher
+from token_cache import token_cache
+from response_cache import response_cache
+
+# Усі адміністративні маршрути доступні лише користувачам з ADMIN_USERNAMES
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(get_current_admin_user)])
+
+@router.get("/indexes", response_model=Dict[str, Any])
+async def get_index_report():
+    return await index_usage_report()
+
+@router.post("/stats/rebuild", response_model=Dict[str, Any])
+async def rebuild_book_stats():
+    await book_stats_repository.rebuild()
+    await catalog_cache.bump()
+    return await book_stats_repository.get_stats()
+
+@router.get("/write-coalescer", response_model=Dict[str, Any])
+async def get_write_coalescer_stats():
+    if not book_repository.insert_coalescer:
+        return {"enabled": False}
+    return {"enabled": True, **book_repository.insert_coalescer.stats()}
+
+@router.get("/password-hasher", response_model=Dict[str, Any])
+async def get_password_hasher_stats():
+    return password_hasher.stats()
+
+@router.get("/cache", response_model=Dict[str, Any])
+async def get_cache_stats():
+    return {
+        "catalog": catalog_cache.stats(),
+        "book": book_repository.book_cache.stats(),
+        "missing_book": book_repository.missing_books.stats(),
+        "response": response_cache.cache.stats(),
+        "user": user_cache.stats(),
+        "token": token_cache.stats(),
+        "book_single_flight": book_repository.single_flight.stats()
+    }
+
+async def _set_user_active(username: str, is_active: bool) -> Dict[str, Any]:
+    user = await user_repository.set_user_active(username, is_active)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Користувача {username} не знайдено"
+        )
+    return {"username": user.username, "is_active": user.is_active}
+
+@router.post("/users/{username}/deactivate", response_model=Dict[str, Any])
+async def deactivate_user(username: str):
+    return await _set_user_active(username, False)
+
+@router.post("/users/{username}/activate", response_model=Dict[str, Any])
+async def activate_user(username: str):
+    return await _set_user_active(username, True)
@@ -1,11 +1,14 @@
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from config import settings
 from models import TokenData, User
 from password_utils import verify_password
+from token_cache import token_cache
 
 security = HTTPBearer()
 
@@ -16,29 +19,49 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def verify_token(token: str, token_type: str = "access") -> Optional[str]:
+async def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    generation = token_cache.local.generation
+    start = time.perf_counter()
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        token_type_from_payload: str = payload.get("type")
-        
-        if username is None or token_type_from_payload != token_type:
-            return None
-        
-        return username
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
+    token_cache.record_decode(time.perf_counter() - start)
+
+    revoked = await token_cache.is_revoked(token)
+    if revoked:
+        return None
+    if revoked is False:
+        token_cache.set(token, claims, generation=generation)
+    return claims
+
+async def verify_token(token: str, token_type: str = "access") -> Optional[str]:
+    payload = await decode_token(token)
+    if payload is None:
+        return None
+
+    username: str = payload.get("sub")
+    token_type_from_payload: str = payload.get("type")
+    
+    if username is None or token_type_from_payload != token_type:
+        return None
+    
+    return username
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     from user_repository import user_repository
@@ -53,7 +76,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     if username is None:
         raise credentials_exception
     
-    user = await user_repository.get_user_by_username(username)
+    user = await user_repository.get_authenticated_user(username)
     if user is None:
         raise credentials_exception
     
@@ -64,6 +87,11 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+async def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
+    if current_user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостатньо прав")
+    return current_user
+
 async def get_current_user_optional(credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))) -> Optional[User]:
     if not credentials:
         return None
@@ -75,7 +103,7 @@ async def get_current_user_optional(credentials: Optional[HTTPAuthorizationCrede
         if username is None:
             return None
         
-        user = await user_repository.get_user_by_username(username)
+        user = await user_repository.get_authenticated_user(username)
         if user and user.is_active:
             return user
         return None
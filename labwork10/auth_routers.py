@@ -1,8 +1,11 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.security import HTTPAuthorizationCredentials
 from models import UserCreate, UserLogin, Token, RefreshTokenRequest, UserResponse
 from user_repository import user_repository
-from password_utils import verify_password
-from auth import create_access_token, create_refresh_token, verify_token, get_current_active_user
+from password_utils import password_hasher, PasswordHasherBusy
+from auth import create_access_token, create_refresh_token, verify_token, decode_token, get_current_active_user, security
+from token_cache import token_cache, TokenRevocationUnavailable
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -22,6 +25,12 @@ async def register_user(user_data: UserCreate):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except PasswordHasherBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -33,7 +42,17 @@ async def login_user(user_credentials: UserLogin):
     user = await user_repository.get_user_by_username(user_credentials.username)
     
     # Перевіряємо чи існує користувач і чи правильний пароль
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    password_ok, new_hash = False, None
+    try:
+        if user:
+            password_ok, new_hash = await password_hasher.verify_and_rehash(user_credentials.password, user.hashed_password)
+    except PasswordHasherBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неправильний username або пароль",
@@ -46,6 +65,10 @@ async def login_user(user_credentials: UserLogin):
             detail="Неактивний користувач"
         )
 
+    # Хеш створено з іншою кількістю раундів bcrypt — оновлюємо, поки знаємо пароль
+    if new_hash:
+        await user_repository.update_password_hash(user.username, user.hashed_password, new_hash)
+
     access_token = create_access_token(data={"sub": user.username})
     refresh_token = create_refresh_token(data={"sub": user.username})
     
@@ -81,6 +104,33 @@ async def refresh_token(token_request: RefreshTokenRequest):
         token_type="bearer"
     )
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_user(
+    token_request: Optional[RefreshTokenRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    claims = await decode_token(credentials.credentials)
+    if claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        await token_cache.revoke(credentials.credentials, claims["exp"])
+
+        # Разом з access токеном відкликаємо і refresh токен того ж користувача, якщо його передали
+        if token_request:
+            refresh_claims = await decode_token(token_request.refresh_token)
+            if refresh_claims and refresh_claims.get("sub") == claims.get("sub"):
+                await token_cache.revoke(token_request.refresh_token, refresh_claims["exp"])
+    except TokenRevocationUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user = Depends(get_current_active_user)):
     return UserResponse(
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import statistics
+import time
+from typing import Awaitable, Callable, List, Tuple
+from password_utils import PasswordHasher, get_password_hash, verify_password
+
+LOGIN_BURSTS = 4
+LOGINS_PER_BURST = 10
+WORKER_COUNTS = (1, 2, 4)
+CATALOG_REQUESTS = 400
+CATALOG_INTERVAL = 0.005
+
+# Імітація читання каталогу: запит чекає на I/O ~1 ms. Запити приходять за розкладом
+# незалежно від стану event loop, тож затримку рахуємо від запланованого часу приходу
+async def catalog_request(latencies: List[float], arrived_at: float):
+    await asyncio.sleep(0.001)
+    latencies.append(time.perf_counter() - arrived_at)
+
+async def catalog_load(latencies: List[float]):
+    requests = []
+    start = time.perf_counter()
+    for i in range(CATALOG_REQUESTS):
+        arrived_at = start + i * CATALOG_INTERVAL
+        await asyncio.sleep(max(arrived_at - time.perf_counter(), 0))
+        requests.append(asyncio.create_task(catalog_request(latencies, arrived_at)))
+    await asyncio.gather(*requests)
+
+async def login_inline(password: str, hashed: str):
+    verify_password(password, hashed)
+
+async def timed(login: Callable[[str, str], Awaitable], password: str, hashed: str, latencies: List[float], arrived_at: float):
+    await login(password, hashed)
+    latencies.append(time.perf_counter() - arrived_at)
+
+def percentile(values: List[float], p: float) -> float:
+    return statistics.quantiles(values, n=100)[int(p) - 1] * 1000
+
+async def run(login: Callable[[str, str], Awaitable], password: str, hashed: str) -> Tuple[List[float], List[float]]:
+    catalog_latencies: List[float] = []
+    login_latencies: List[float] = []
+    load = asyncio.create_task(catalog_load(catalog_latencies))
+    # Логіни приходять пачками по LOGINS_PER_BURST одночасних запитів
+    pause = CATALOG_REQUESTS * CATALOG_INTERVAL / LOGIN_BURSTS
+    for _ in range(LOGIN_BURSTS):
+        await asyncio.sleep(pause / 2)
+        arrived_at = time.perf_counter()
+        await asyncio.gather(*(timed(login, password, hashed, login_latencies, arrived_at) for _ in range(LOGINS_PER_BURST)))
+    await load
+    return catalog_latencies, login_latencies
+
+def report(name: str, catalog_latencies: List[float], login_latencies: List[float]):
+    login_p99 = f"{percentile(login_latencies, 99):7.1f} ms" if login_latencies else "      -   "
+    print(
+        f"{name:22} каталог p50 {percentile(catalog_latencies, 50):7.1f} ms, "
+        f"p99 {percentile(catalog_latencies, 99):7.1f} ms; логін p99 {login_p99}"
+    )
+
+async def main():
+    password = "benchmark-password"
+    hashed = get_password_hash(password)
+    print(
+        f"bcrypt rounds {hashed.split('$')[2]}, {LOGIN_BURSTS} пачки по {LOGINS_PER_BURST} логінів, "
+        f"{CATALOG_REQUESTS} запитів каталогу, CPU {os.cpu_count()}"
+    )
+    report("без логінів", *await run(lambda *args: asyncio.sleep(0), password, hashed))
+    report("bcrypt в event loop", *await run(login_inline, password, hashed))
+    for workers in WORKER_COUNTS:
+        hasher = PasswordHasher(workers, LOGINS_PER_BURST)
+        try:
+            report(f"пул з {workers} потоків", *await run(hasher.verify, password, hashed))
+        finally:
+            hasher.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
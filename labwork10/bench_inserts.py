@@ -0,0 +1,84 @@
+import asyncio
+import time
+from config import settings
+from database import connect_to_mongo, close_mongo_connection
+from redis_client import redis_client
+from repository import book_repository
+from stats_repository import book_stats_repository
+from book_counter import book_total_counter
+import catalog_cache
+from write_coalescer import WriteCoalescer
+from models import BookCreate
+
+WRITERS = (100, 500, 1000)
+BENCH_COLLECTION = "books_bench"
+BENCH_STATS_COLLECTION = "book_stats_bench"
+BENCH_COUNTER_KEY = "books_total_bench"
+BENCH_GENERATION_KEY = "catalog_generation_bench"
+BENCH_CHANGED_KEY = "catalog_changed_bench"
+
+def book(i: int) -> BookCreate:
+    return BookCreate(title=f"Bench Book {i}", author="Bench", year_published=2000, genre="bench")
+
+async def run(writers: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(book_repository.create_book(book(i)) for i in range(writers)))
+    return time.perf_counter() - start
+
+async def main():
+    await connect_to_mongo()
+    await redis_client.connect()
+    # Усі побічні записи create_book (статистика, лічильник, покоління каталогу)
+    # ідуть в окремі bench-колекцію та ключі, щоб не зіпсувати робочі дані;
+    # після заміру оригінальні імена повертаються
+    originals = (
+        book_repository.collection_name,
+        book_repository.insert_coalescer,
+        book_stats_repository.collection_name,
+        book_total_counter.key,
+        catalog_cache.GENERATION_KEY,
+        catalog_cache.CHANGED_KEY
+    )
+    book_repository.collection_name = BENCH_COLLECTION
+    book_stats_repository.collection_name = BENCH_STATS_COLLECTION
+    book_total_counter.key = BENCH_COUNTER_KEY
+    catalog_cache.GENERATION_KEY = BENCH_GENERATION_KEY
+    catalog_cache.CHANGED_KEY = BENCH_CHANGED_KEY
+    try:
+        print(f"Вікно {settings.BOOK_INSERT_COALESCE_WINDOW_MS} ms, max batch {settings.BOOK_INSERT_COALESCE_MAX_BATCH}")
+        for writers in WRITERS:
+            book_repository.insert_coalescer = None
+            plain = await run(writers)
+
+            coalescer = WriteCoalescer(
+                book_repository._insert_coalesced,
+                settings.BOOK_INSERT_COALESCE_WINDOW_MS,
+                settings.BOOK_INSERT_COALESCE_MAX_BATCH
+            )
+            book_repository.insert_coalescer = coalescer
+            coalesced = await run(writers)
+
+            print(
+                f"{writers:5} writers: insert_one {writers / plain:8.0f} doc/s, "
+                f"coalesced {writers / coalesced:8.0f} doc/s "
+                f"({coalescer.batches} batches, x{plain / coalesced:.1f})"
+            )
+    finally:
+        try:
+            await book_repository.collection.drop()
+            await book_stats_repository.collection.drop()
+            await redis_client.get_client().delete(BENCH_COUNTER_KEY, BENCH_GENERATION_KEY, BENCH_CHANGED_KEY)
+        finally:
+            (
+                book_repository.collection_name,
+                book_repository.insert_coalescer,
+                book_stats_repository.collection_name,
+                book_total_counter.key,
+                catalog_cache.GENERATION_KEY,
+                catalog_cache.CHANGED_KEY
+            ) = originals
+            await redis_client.disconnect()
+            await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+import time
+from typing import List
+from bson import ObjectId
+from pydantic import TypeAdapter
+from models import Book
+from repository import _to_book_dict
+from user_repository import _to_user
+
+PAGE_SIZE = 10_000
+ROUNDS = 5
+
+def make_docs() -> List[dict]:
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Book {i}",
+            "author": f"Author {i % 500}",
+            "year_published": 1900 + i % 120,
+            "genre": f"genre-{i % 20}"
+        }
+        for i in range(PAGE_SIZE)
+    ]
+
+def validated(docs):
+    books = []
+    for doc in docs:
+        doc["_id"] = str(doc["_id"])
+        books.append(Book(**doc))
+    return [book.model_dump() for book in books]
+
+books_adapter = TypeAdapter(List[Book])
+
+def type_adapter(docs):
+    for doc in docs:
+        doc["_id"] = str(doc["_id"])
+    return [book.model_dump() for book in books_adapter.validate_python(docs)]
+
+def constructed(docs):
+    books = []
+    for doc in docs:
+        doc["_id"] = str(doc["_id"])
+        books.append(Book.model_construct(**doc))
+    return [book.model_dump() for book in books]
+
+def untrusted_page(docs):
+    return [_to_book_dict(doc, None, trusted=False) for doc in docs]
+
+def trusted_page(docs):
+    return [_to_book_dict(doc, None, trusted=True) for doc in docs]
+
+def make_user_docs() -> List[dict]:
+    return [
+        {
+            "_id": ObjectId(),
+            "username": f"user{i}",
+            "email": f"user{i}@example.com",
+            "hashed_password": "$2b$12$" + "x" * 53,
+            "is_active": True
+        }
+        for i in range(PAGE_SIZE)
+    ]
+
+def untrusted_users(docs):
+    return [_to_user(doc, trusted=False) for doc in docs]
+
+def trusted_users(docs):
+    return [_to_user(doc, trusted=True) for doc in docs]
+
+def measure(func, factory=make_docs) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        docs = factory()
+        start = time.perf_counter()
+        func(docs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def report(title, cases, factory=make_docs):
+    print(title)
+    baseline = None
+    for name, func in cases:
+        elapsed = measure(func, factory)
+        baseline = baseline or elapsed
+        per_doc = elapsed / PAGE_SIZE * 1_000_000
+        print(f"  {name:40} {elapsed * 1000:8.2f} ms  {per_doc:6.2f} us/doc  x{baseline / elapsed:.1f}")
+
+if __name__ == "__main__":
+    print(f"Сторінка з {PAGE_SIZE} документів, найкращий з {ROUNDS} прогонів\n")
+    report("Книги (документ -> dict відповіді)", [
+        ("Book(**doc) + model_dump", validated),
+        ("TypeAdapter(List[Book]) + model_dump", type_adapter),
+        ("model_construct + model_dump", constructed),
+        ("_to_book_dict, TRUSTED_READS=false", untrusted_page),
+        ("_to_book_dict, TRUSTED_READS=true", trusted_page),
+    ])
+    report("Користувачі (документ -> User)", [
+        ("_to_user, TRUSTED_READS=false", untrusted_users),
+        ("_to_user, TRUSTED_READS=true", trusted_users),
+    ], make_user_docs)
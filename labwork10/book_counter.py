@@ -0,0 +1,49 @@
+from typing import Awaitable, Callable
+from redis_client import redis_client
+from config import settings
+
+INCR_IF_EXISTS = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+class BookTotalCounter:
+    def __init__(self, redis_client_instance=None, key: str = "books_total", ttl: int = None):
+        self.redis_client_instance = redis_client_instance or redis_client
+        self.key = key
+        self.ttl = ttl or settings.BOOKS_TOTAL_CACHE_TTL
+    
+    def _get_redis(self):
+        if hasattr(self.redis_client_instance, 'get_client'):
+            return self.redis_client_instance.get_client()
+        return self.redis_client_instance
+    
+    async def get(self, load: Callable[[], Awaitable[int]]) -> int:
+        try:
+            cached = await self._get_redis().get(self.key)
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            print(f"Book counter error: {e}")
+            return await load()
+
+        total = await load()
+        try:
+            # nx: не перезаписуємо значення, яке паралельно вже встановив інший воркер
+            await self._get_redis().set(self.key, total, ex=self.ttl, nx=True)
+        except Exception as e:
+            print(f"Book counter error: {e}")
+        return total
+    
+    async def add(self, delta: int):
+        if not delta:
+            return
+        try:
+            r = self._get_redis()
+            await r.register_script(INCR_IF_EXISTS)(keys=[self.key], args=[delta])
+        except Exception as e:
+            print(f"Book counter error: {e}")
+
+book_total_counter = BookTotalCounter()
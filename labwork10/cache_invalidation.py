@@ -0,0 +1,75 @@
+import asyncio
+from typing import Callable, Dict, Optional
+from redis_client import redis_client
+from config import settings
+
+class CacheInvalidationBus:
+    """Розсилає інвалідації локальних кешів між воркерами через Redis pub/sub.
+    Повідомлення має вигляд "<namespace>:<key>"."""
+
+    def __init__(self, redis_client_instance=None, channel: str = None):
+        self.redis_client_instance = redis_client_instance or redis_client
+        self.channel = channel or settings.CACHE_INVALIDATION_CHANNEL
+        self._handlers: Dict[str, Callable[[str], None]] = {}
+        self._resets: Dict[str, Callable[[], None]] = {}
+        self._listener: Optional[asyncio.Task] = None
+    
+    def _get_redis(self):
+        if hasattr(self.redis_client_instance, 'get_client'):
+            return self.redis_client_instance.get_client()
+        return self.redis_client_instance
+    
+    def register(self, namespace: str, invalidate: Callable[[str], None], reset: Callable[[], None]):
+        self._handlers[namespace] = invalidate
+        self._resets[namespace] = reset
+    
+    async def publish(self, namespace: str, key: str):
+        self._handle(f"{namespace}:{key}")
+        try:
+            await self._get_redis().publish(self.channel, f"{namespace}:{key}")
+        except Exception as e:
+            print(f"Cache invalidation error: {e}")
+    
+    def _handle(self, message: str):
+        namespace, _, key = message.partition(":")
+        handler = self._handlers.get(namespace)
+        if handler:
+            handler(key)
+    
+    def _reset_all(self):
+        for reset in self._resets.values():
+            reset()
+    
+    async def _listen(self):
+        while True:
+            pubsub = self._get_redis().pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Поки підписки не було, повідомлення могли загубитися
+                self._reset_all()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._handle(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Cache invalidation listener error: {e}")
+                self._reset_all()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+    
+    def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+    
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+cache_invalidation = CacheInvalidationBus()
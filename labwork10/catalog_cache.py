@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from motor.motor_asyncio import AsyncIOMotorCollection
+from database import get_collection
+from redis_client import redis_client
+from single_flight import SingleFlight
+from config import settings
+
+GENERATION_KEY = "catalog_generation"
+CHANGED_KEY = "catalog_changed"
+
+def params_digest(params: Dict[str, Any]) -> str:
+    raw = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class CatalogCache:
+    """Read-through кеш читань каталогу в Redis. Ключі містять номер покоління каталогу,
+    тож будь-який запис інвалідовує все одним INCR, однаково для всіх воркерів.
+
+    Запис вважається свіжим ttl секунд; ще max_staleness секунд його віддають як є,
+    а оновлюють у фоні (stale-while-revalidate). Нещодавно запитані ключі запам'ятовуються,
+    щоб refresh_hot міг прогріти їх для нового покоління до приходу запитів.
+
+    Протягом primary_fill_window секунд після запису кеш заповнюється з primary:
+    secondary може ще не мати змін, а ключ нового покоління житиме ttl + max_staleness."""
+
+    def __init__(
+        self,
+        redis_client_instance=None,
+        ttl: int = None,
+        enabled: bool = None,
+        max_staleness: int = None,
+        max_hot_keys: int = None,
+        primary_fill_window: int = None
+    ):
+        self.redis_client_instance = redis_client_instance or redis_client
+        self.ttl = ttl or settings.CATALOG_CACHE_TTL
+        self.enabled = settings.CATALOG_CACHE_ENABLED if enabled is None else enabled
+        self.max_staleness = settings.CATALOG_CACHE_MAX_STALENESS if max_staleness is None else max_staleness
+        self.max_hot_keys = max_hot_keys or settings.CATALOG_REFRESH_MAX_KEYS
+        self.primary_fill_window = primary_fill_window or settings.CATALOG_PRIMARY_FILL_WINDOW
+        self._hot: "OrderedDict[str, Tuple[str, Dict[str, Any], Callable[[], Awaitable[Any]]]]" = OrderedDict()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.single_flight = SingleFlight()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+    
+    def _get_redis(self):
+        if hasattr(self.redis_client_instance, 'get_client'):
+            return self.redis_client_instance.get_client()
+        return self.redis_client_instance
+    
+    async def generation(self) -> int:
+        return int(await self._get_redis().get(GENERATION_KEY) or 0)
+    
+    async def bump(self):
+        try:
+            generation = await self._get_redis().incr(GENERATION_KEY)
+            await self._get_redis().set(CHANGED_KEY, generation, ex=self.primary_fill_window)
+        except Exception as e:
+            self.errors += 1
+            print(f"Catalog cache error: {e}")
+    
+    async def fill_collection(self, name: str) -> AsyncIOMotorCollection:
+        """Колекція для завантаження, результат якого піде в кеш. Поза вікном після запису
+        читаємо з профілю catalog (secondary, якщо так налаштовано), інакше — з primary."""
+        if not self.enabled:
+            return get_collection(name, "catalog")
+        try:
+            recently_changed = await self._get_redis().exists(CHANGED_KEY)
+        except Exception as e:
+            self.errors += 1
+            print(f"Catalog cache error: {e}")
+            recently_changed = True
+        return get_collection(name, "primary" if recently_changed else "catalog")
+    
+    async def _key(self, name: str, params: Dict[str, Any]) -> str:
+        return f"catalog_cache_{await self.generation()}_{name}_{params_digest(params)}"
+    
+    async def _store(self, key: str, value: Any):
+        entry = json.dumps({"at": time.time(), "v": value})
+        await self._get_redis().set(key, entry, ex=self.ttl + self.max_staleness)
+    
+    def _remember(self, name: str, params: Dict[str, Any], load: Callable[[], Awaitable[Any]]):
+        hot_key = f"{name}_{params_digest(params)}"
+        self._hot[hot_key] = (name, params, load)
+        self._hot.move_to_end(hot_key)
+        while len(self._hot) > self.max_hot_keys:
+            self._hot.popitem(last=False)
+    
+    async def _reload(self, key: str, load: Callable[[], Awaitable[Any]]):
+        try:
+            await self._store(key, await load())
+            self.refreshes += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"Catalog cache refresh error: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+    
+    def _refresh_in_background(self, key: str, load: Callable[[], Awaitable[Any]]):
+        if key not in self._refreshing:
+            self._refreshing[key] = asyncio.create_task(self._reload(key, load))
+    
+    async def get_or_load(self, name: str, params: Dict[str, Any], load: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            key = await self._key(name, params)
+        except Exception as e:
+            self.errors += 1
+            print(f"Catalog cache error: {e}")
+            return await load()
+
+        # Ключ містить покоління, тож запит після запису (на будь-якому воркері)
+        # ніколи не приєднається до завантаження, почату до нього
+        if not self.enabled:
+            return await self.single_flight.do(key, load)
+
+        self._remember(name, params, load)
+        return await self.single_flight.do(key, lambda: self._read_through(key, load))
+    
+    async def _read_through(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            cached = await self._get_redis().get(key)
+        except Exception as e:
+            self.errors += 1
+            print(f"Catalog cache error: {e}")
+            return await load()
+
+        if cached is not None:
+            entry = json.loads(cached)
+            if time.time() - entry["at"] < self.ttl:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh_in_background(key, load)
+            return entry["v"]
+
+        self.misses += 1
+        value = await load()
+        try:
+            await self._store(key, value)
+        except Exception as e:
+            self.errors += 1
+            print(f"Catalog cache error: {e}")
+        return value
+    
+    async def refresh_hot(self, ahead: float = 0):
+        """Перезавантажує запам'ятовані ключі, яких немає для поточного покоління
+        або які стануть несвіжими протягом ahead секунд."""
+        for name, params, load in list(self._hot.values()):
+            key = await self._key(name, params)
+            if key in self._refreshing:
+                continue
+            cached = await self._get_redis().get(key)
+            if cached is not None and time.time() - json.loads(cached)["at"] < self.ttl - ahead:
+                continue
+            await self._reload(key, load)
+    
+    async def stop(self):
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refreshing.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "hot_keys": len(self._hot),
+            "single_flight": self.single_flight.stats(),
+            "errors": self.errors,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+        }
+
+catalog_cache = CatalogCache()
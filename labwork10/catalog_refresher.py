@@ -0,0 +1,55 @@
+import asyncio
+from typing import Optional
+from catalog_cache import catalog_cache
+from repository import book_repository
+from stats_repository import book_stats_repository
+from config import settings
+
+class CatalogRefresher:
+    """Прогріває кеш каталогу під час старту і далі кожні interval секунд оновлює
+    гарячі ключі, щоб перші запити після деплою чи запису не чекали на MongoDB."""
+
+    def __init__(self, cache=None, interval: float = None):
+        self.cache = cache or catalog_cache
+        self.interval = interval or settings.CATALOG_REFRESH_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+    
+    async def warm_up(self):
+        # Те саме, що запитують GET /api/v1/books і GET /api/v1/books/stats без параметрів
+        results = await asyncio.gather(
+            book_repository.get_books_page(settings.BOOKS_PAGE_SIZE),
+            book_repository.count_books(strategy=settings.BOOKS_COUNT_STRATEGY),
+            book_stats_repository.get_stats(),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Catalog warm-up error: {result}")
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.cache.refresh_hot(self.interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Catalog refresh error: {e}")
+    
+    async def start(self):
+        if not self.cache.enabled or self._task is not None:
+            return
+        await self.warm_up()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.cache.stop()
+
+catalog_refresher = CatalogRefresher()
@@ -1,8 +1,18 @@
 import motor.motor_asyncio
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
+from functools import lru_cache
 from typing import Optional
 from config import settings
 
+READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
 class Database:
     client: Optional[AsyncIOMotorClient] = None
     database: Optional[AsyncIOMotorDatabase] = None
@@ -11,7 +21,11 @@ db = Database()
 
 async def connect_to_mongo():
 
-    db.client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URL)
+    db.client = motor.motor_asyncio.AsyncIOMotorClient(
+        settings.MONGO_URL,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE
+    )
     db.database = db.client[settings.DATABASE_NAME]
     print(f"Підключено до MongoDB: {settings.DATABASE_NAME}")
 
@@ -22,4 +36,20 @@ async def close_mongo_connection():
         print("Підключення до MongoDB закрито")
 
 def get_database() -> AsyncIOMotorDatabase:
-    return db.database
\ No newline at end of file
+    return db.database
+
+@lru_cache(maxsize=None)
+def _read_profile(profile: str):
+    options = settings.MONGO_READ_PROFILES[profile]
+    mode = options["read_preference"]
+    if mode == "primary":
+        read_preference = Primary()
+    elif mode in READ_PREFERENCES:
+        read_preference = READ_PREFERENCES[mode](max_staleness=options["max_staleness"])
+    else:
+        raise ValueError(f"Невідомий read preference '{mode}' у профілі '{profile}'")
+    return read_preference, ReadConcern(options["read_concern"])
+
+def get_collection(name: str, profile: str = "primary") -> AsyncIOMotorCollection:
+    read_preference, read_concern = _read_profile(profile)
+    return get_database().get_collection(name, read_preference=read_preference, read_concern=read_concern)
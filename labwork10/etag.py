@@ -0,0 +1,36 @@
+import hashlib
+from typing import Dict, Optional
+from fastapi import Request, Response, status
+from catalog_cache import catalog_cache
+
+async def current_generation() -> Optional[int]:
+    try:
+        return await catalog_cache.generation()
+    except Exception as e:
+        print(f"ETag error: {e}")
+        return None
+
+def generation_etag(request: Request, generation: Optional[int], *variant: str) -> Optional[str]:
+    if generation is None:
+        return None
+    material = "|".join([str(generation), request.url.path, request.url.query, *variant])
+    return '"' + hashlib.sha1(material.encode("utf-8")).hexdigest() + '"'
+
+async def catalog_etag(request: Request, *variant: str) -> Optional[str]:
+    """Сильний ETag для читань каталогу: покоління каталогу + шлях і query запиту.
+    variant додає те, від чого ще залежить тіло відповіді (наприклад, користувача)."""
+    return generation_etag(request, await current_generation(), *variant)
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match використовує слабке порівняння, тому префікс W/ ігноруємо
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    # 304 має нести ті самі Cache-Control/Vary, що й повна відповідь
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**(headers or {}), "ETag": etag})
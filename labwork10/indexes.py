@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Dict, List
+from pymongo.errors import OperationFailure
+from database import connect_to_mongo, close_mongo_connection
+from repository import book_repository
+from user_repository import user_repository
+from stats_repository import book_stats_repository
+
+INDEXED_REPOSITORIES = [book_repository, user_repository, book_stats_repository]
+
+async def ensure_indexes(repositories=None) -> Dict[str, List[str]]:
+    created = {}
+    for repository in repositories or INDEXED_REPOSITORIES:
+        try:
+            created[repository.collection_name] = await repository.collection.create_indexes(repository.indexes)
+        except OperationFailure as e:
+            print(f"Не вдалося створити індекси для {repository.collection_name}: {e}")
+            created[repository.collection_name] = []
+    return created
+
+async def index_usage_report(repositories=None) -> Dict[str, Any]:
+    report = {}
+    for repository in repositories or INDEXED_REPOSITORIES:
+        declared = {index.document["name"] for index in repository.indexes}
+
+        usage = []
+        async for stats in repository.collection.aggregate([{"$indexStats": {}}]):
+            usage.append({
+                "name": stats["name"],
+                "key": dict(stats["key"]),
+                "ops": stats["accesses"]["ops"],
+                "since": stats["accesses"]["since"].isoformat()
+            })
+
+        existing = {index["name"] for index in usage}
+        report[repository.collection_name] = {
+            "indexes": usage,
+            "unused": [index["name"] for index in usage if index["ops"] == 0 and index["name"] != "_id_"],
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared - {"_id_"})
+        }
+    return report
+
+async def main():
+    await connect_to_mongo()
+    try:
+        created = await ensure_indexes()
+        for collection_name, names in created.items():
+            print(f"{collection_name}: {', '.join(names) or '-'}")
+
+        report = await index_usage_report()
+        for collection_name, collection_report in report.items():
+            print(f"\n{collection_name}")
+            for index in collection_report["indexes"]:
+                print(f"  {index['name']}: {index['ops']} ops з {index['since']}")
+            print(f"  Невикористані: {', '.join(collection_report['unused']) or '-'}")
+            print(f"  Відсутні: {', '.join(collection_report['missing']) or '-'}")
+            print(f"  Не задекларовані: {', '.join(collection_report['undeclared']) or '-'}")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,14 @@
 from fastapi import FastAPI
 from routers import router as books_router
 from auth_routers import router as auth_router
+from admin_routers import router as admin_router
 from database import connect_to_mongo, close_mongo_connection
 from redis_client import redis_client
+from indexes import ensure_indexes
+from repository import book_repository
+from cache_invalidation import cache_invalidation
+from catalog_refresher import catalog_refresher
+from password_utils import password_hasher, calibrate_on_startup
 
 def create_app() -> FastAPI:
     app = FastAPI(
@@ -13,11 +19,16 @@ def create_app() -> FastAPI:
 
     app.include_router(auth_router)
     app.include_router(books_router)
+    app.include_router(admin_router)
 
     @app.on_event("startup")
     async def startup_event():
+        await calibrate_on_startup()
         await connect_to_mongo()
+        await ensure_indexes()
         await redis_client.connect()
+        cache_invalidation.start()
+        await catalog_refresher.start()
         print("API запущено та підключено до MongoDB та Redis")
         print("Доступні ендпоінти:")
         print("- POST /auth/register - реєстрація")
@@ -25,7 +36,9 @@ def create_app() -> FastAPI:
         print("- POST /auth/refresh - оновлення токена")
         print("- GET /auth/me - інформація про користувача")
         print("- GET /api/v1/books/public - публічний список книг (2 req/min для анонімних, 10 для авторизованих)")
+        print("- GET /api/v1/books/public/viewer - хто виконує запит (автентифікований чи анонімний)")
         print("- GET /api/v1/books - список книг (потрібен токен + 10 req/min)")
+        print("- GET /admin/indexes - використання індексів MongoDB")
         print("- Документація: http://localhost:8000/docs")
         print("\nRate Limits:")
         print("- Анонімні користувачі: 2 запити за хвилину")
@@ -33,6 +46,11 @@ def create_app() -> FastAPI:
     
     @app.on_event("shutdown")
     async def shutdown_event():
+        await cache_invalidation.stop()
+        await catalog_refresher.stop()
+        if book_repository.insert_coalescer:
+            await book_repository.insert_coalescer.drain()
+        password_hasher.shutdown()
         await close_mongo_connection()
         await redis_client.disconnect()
         print("Підключення до MongoDB та Redis закрито")
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field, EmailStr
 from bson import ObjectId
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+from config import settings
 
 class Book(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
@@ -15,12 +16,56 @@ class Book(BaseModel):
         arbitrary_types_allowed = True
         json_encoders = {ObjectId: str}
 
+class BookPartial(BaseModel):
+    id: Optional[str] = Field(default=None, alias="_id")
+    title: Optional[str] = None
+    author: Optional[str] = None
+    year_published: Optional[int] = None
+    genre: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+
+BOOK_FIELDS = ("title", "author", "year_published", "genre")
+BOOK_SORT_FIELDS = ("_id",) + BOOK_FIELDS
+BOOK_FIELD_TYPES = {"title": str, "author": str, "year_published": int, "genre": str}
+
+class BookListQuery(BaseModel):
+    author: Optional[str] = None
+    genre: Optional[str] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    sort: str = "_id"
+
 class BookCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=150)
     author: str = Field(..., min_length=1, max_length=100)
     year_published: int = Field(..., ge=1000, le=2025)
     genre: str = Field(..., min_length=1, max_length=50)
 
+class BookUpdate(BaseModel):
+    title: Optional[str] = Field(default=None, min_length=1, max_length=150)
+    author: Optional[str] = Field(default=None, min_length=1, max_length=100)
+    year_published: Optional[int] = Field(default=None, ge=1000, le=2025)
+    genre: Optional[str] = Field(default=None, min_length=1, max_length=50)
+
+class BookBulkCreate(BaseModel):
+    books: List[BookCreate] = Field(..., min_length=1, max_length=settings.BOOKS_BULK_MAX_ITEMS)
+
+class BookBulkItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    created: bool
+    error: Optional[str] = None
+
+class BookBulkCreateResponse(BaseModel):
+    inserted: int
+    failed: int
+    results: List[BookBulkItemResult]
+
+class BookBatchGet(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=settings.BOOKS_BATCH_GET_MAX_ITEMS)
+
 class User(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
     username: str = Field(..., min_length=3, max_length=50)
@@ -0,0 +1,28 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+
+class InvalidCursorError(ValueError):
+    pass
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, value_type: Optional[type] = None) -> Dict[str, Any]:
+    """value_type — тип поля сортування; "v" з курсора потрапляє у фільтр Mongo,
+    тож приймаємо лише скаляр саме цього типу, а не вкладений оператор на кшталт {"$ne": null}."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, dict) or "id" not in payload:
+            raise InvalidCursorError("Невалідний курсор пагінації")
+        payload["id"] = ObjectId(payload["id"])
+        if value_type is not None and type(payload.get("v")) is not value_type:
+            raise InvalidCursorError("Невалідний курсор пагінації")
+        return payload
+    except (binascii.Error, UnicodeError, ValueError, TypeError, InvalidId):
+        raise InvalidCursorError("Невалідний курсор пагінації")
@@ -1,9 +1,136 @@
+import asyncio
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
+from config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def calibrate_bcrypt_rounds(
+    target_ms: float = None,
+    min_rounds: int = None,
+    max_rounds: int = None
+) -> int:
+    """Найбільша кількість раундів, за якої один хеш на цьому CPU триває не довше target_ms.
+    Кожен раунд подвоює вартість, тож достатньо одного виміру на min_rounds."""
+    target_ms = target_ms or settings.PASSWORD_HASH_TARGET_MS
+    min_rounds = min_rounds or settings.PASSWORD_BCRYPT_MIN_ROUNDS
+    max_rounds = max_rounds or settings.PASSWORD_BCRYPT_MAX_ROUNDS
+
+    hasher = bcrypt.using(rounds=min_rounds)
+    # Найкращий з трьох вимірів, щоб прогрів і шум не занижували раунди
+    elapsed_ms = min(_time_hash(hasher) for _ in range(3))
+    rounds = min_rounds + math.floor(math.log2(target_ms / elapsed_ms)) if elapsed_ms < target_ms else min_rounds
+    return max(min_rounds, min(rounds, max_rounds))
+
+def _time_hash(hasher) -> float:
+    start = time.perf_counter()
+    hasher.hash("calibration-password")
+    return (time.perf_counter() - start) * 1000
+
+def _make_context(rounds: int) -> CryptContext:
+    # needs_update спрацьовує лише для хешів, дешевших за rounds: дорожчі не понижуємо,
+    # і процеси з різними rounds не перехешовують паролі один одного по колу
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds
+    )
+
+def _pinned_rounds() -> Optional[int]:
+    if settings.PASSWORD_BCRYPT_ROUNDS == "auto":
+        return None
+    return int(settings.PASSWORD_BCRYPT_ROUNDS)
+
+# До калібрування при старті (режим auto) використовуємо типові для passlib 12 раундів
+bcrypt_rounds = _pinned_rounds() or 12
+pwd_context = _make_context(bcrypt_rounds)
+
+def use_bcrypt_rounds(rounds: int):
+    global bcrypt_rounds, pwd_context
+    bcrypt_rounds = rounds
+    pwd_context = _make_context(rounds)
+
+async def calibrate_on_startup():
+    if _pinned_rounds() is None:
+        use_bcrypt_rounds(await asyncio.to_thread(calibrate_bcrypt_rounds))
+        print(f"bcrypt rounds підібрано: {bcrypt_rounds}")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+def verify_and_rehash(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Перевіряє пароль і, якщо хеш має інші раунди, ніж налаштовані, повертає новий."""
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, None
+    if pwd_context.needs_update(hashed_password):
+        return True, pwd_context.hash(plain_password)
+    return True, None
+
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+class PasswordHasher:
+    """Виконує bcrypt в обмеженому пулі потоків, щоб хешування не блокувало event loop.
+    bcrypt відпускає GIL, тож потоки працюють паралельно. Якщо в роботі й у черзі вже
+    workers + max_queue операцій, нові відхиляються з PasswordHasherBusy."""
+
+    def __init__(self, workers: int = None, max_queue: int = None):
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_queue = settings.PASSWORD_HASH_QUEUE_LIMIT if max_queue is None else max_queue
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+    
+    def _release(self):
+        self.pending -= 1
+        self.completed += 1
+    
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy("Сервер перевантажено операціями з паролями, спробуйте пізніше")
+
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        future = self._executor.submit(fn, *args)
+        # Лічильник зменшуємо, коли потік справді завершився, а не коли клієнт перестав чекати
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wrap_future(future)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+    
+    async def verify_and_rehash(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_rehash, plain_password, hashed_password)
+    
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "bcrypt_rounds": bcrypt_rounds,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+password_hasher = PasswordHasher()
+
+if __name__ == "__main__":
+    chosen = calibrate_bcrypt_rounds()
+    print(f"Ціль {settings.PASSWORD_HASH_TARGET_MS} ms на хеш")
+    for rounds in range(settings.PASSWORD_BCRYPT_MIN_ROUNDS, chosen + 2):
+        print(f"rounds {rounds:2}: {_time_hash(bcrypt.using(rounds=rounds)):7.1f} ms")
+    print(f"Обрано rounds {chosen}; щоб зафіксувати: PASSWORD_BCRYPT_ROUNDS={chosen}")
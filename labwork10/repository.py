@@ -1,48 +1,395 @@
+import json
 from motor.motor_asyncio import AsyncIOMotorCollection
-from models import Book, BookCreate
-from database import get_database
+from models import Book, BookCreate, BookPartial, BookBulkItemResult, BookListQuery, BOOK_FIELD_TYPES
+from database import get_database, get_collection
 from bson import ObjectId
-from typing import List, Optional
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError, WriteError
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+from pagination import encode_cursor, decode_cursor, InvalidCursorError
+from config import settings
+from stats_repository import book_stats_repository
+from book_counter import book_total_counter
+from write_coalescer import WriteCoalescer
+from local_cache import LRUTTLCache
+from cache_invalidation import cache_invalidation
+from catalog_cache import catalog_cache
+from single_flight import SingleFlight
+
+def _projection(fields: Optional[Sequence[str]]) -> Optional[Dict[str, int]]:
+    if not fields:
+        return None
+    return {field: 1 for field in fields}
+
+def _to_book(book_doc: dict, fields: Optional[Sequence[str]]) -> Union[Book, BookPartial]:
+    book_doc["_id"] = str(book_doc["_id"])
+    if fields:
+        return BookPartial(**book_doc)
+    return Book(**book_doc)
+
+def _to_book_dict(book_doc: dict, fields: Optional[Sequence[str]], trusted: bool) -> Dict[str, Any]:
+    if trusted:
+        # Документи записуються лише через BookCreate, тож повторна валідація зайва
+        book_id = str(book_doc.pop("_id"))
+        return {"id": book_id, **book_doc}
+    return _to_book(book_doc, fields).model_dump(exclude_unset=True)
+
+def _book_filter(query: BookListQuery) -> Dict[str, Any]:
+    mongo_filter = {}
+    if query.author:
+        mongo_filter["author"] = query.author
+    if query.genre:
+        mongo_filter["genre"] = query.genre
+    if query.year_from is not None or query.year_to is not None:
+        years = {}
+        if query.year_from is not None:
+            years["$gte"] = query.year_from
+        if query.year_to is not None:
+            years["$lte"] = query.year_to
+        mongo_filter["year_published"] = years
+    return mongo_filter
+
+def _sort_spec(sort: str) -> Tuple[str, int]:
+    if sort.startswith("-"):
+        return sort[1:], DESCENDING
+    return sort, ASCENDING
+
+def _plan_stages(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    stages = [{"stage": plan.get("stage"), "index": plan.get("indexName")}]
+    children = plan.get("inputStages", [])
+    if "inputStage" in plan:
+        children = children + [plan["inputStage"]]
+    for child in children:
+        stages.extend(_plan_stages(child))
+    return stages
 
 class BookRepository:
+    indexes = [
+        IndexModel([("author", ASCENDING), ("_id", ASCENDING)], name="author_id"),
+        IndexModel([("genre", ASCENDING), ("_id", ASCENDING)], name="genre_id"),
+        IndexModel([("year_published", ASCENDING), ("_id", ASCENDING)], name="year_published_id"),
+        IndexModel([("title", ASCENDING), ("_id", ASCENDING)], name="title_id"),
+        IndexModel([("author", ASCENDING), ("year_published", ASCENDING), ("_id", ASCENDING)], name="author_year_published_id"),
+        IndexModel([("genre", ASCENDING), ("year_published", ASCENDING), ("_id", ASCENDING)], name="genre_year_published_id"),
+    ]
+
     def __init__(self):
         self.collection_name = "books"
+        self.trusted_reads = settings.TRUSTED_READS
+        self.book_cache = LRUTTLCache(settings.BOOK_CACHE_MAX_ENTRIES, settings.BOOK_CACHE_TTL)
+        cache_invalidation.register("book", self.book_cache.invalidate, self.book_cache.clear)
+        # Id, яких нещодавно не знайшли; скидаються, щойно книгу з таким id створено
+        self.missing_books = LRUTTLCache(settings.MISSING_BOOK_CACHE_MAX_ENTRIES, settings.MISSING_BOOK_CACHE_TTL)
+        self.single_flight = SingleFlight()
+        self.insert_coalescer = None
+        if settings.BOOK_INSERT_COALESCING:
+            self.insert_coalescer = WriteCoalescer(
+                self._insert_coalesced,
+                settings.BOOK_INSERT_COALESCE_WINDOW_MS,
+                settings.BOOK_INSERT_COALESCE_MAX_BATCH
+            )
     
     @property
     def collection(self) -> AsyncIOMotorCollection:
         return get_database()[self.collection_name]
     
+    @property
+    def catalog_collection(self) -> AsyncIOMotorCollection:
+        return get_collection(self.collection_name, "catalog")
+    
+    async def _catalog_changed(self):
+        await catalog_cache.bump()
+    
+    def _forget_missing(self, book_dicts: List[dict]):
+        for book_dict in book_dicts:
+            self.missing_books.invalidate(str(book_dict["_id"]))
+    
+    async def _insert_many(self, book_dicts: List[dict]) -> Dict[int, dict]:
+        for book_dict in book_dicts:
+            book_dict["_id"] = ObjectId()
+
+        errors = {}
+        try:
+            await self.collection.insert_many(book_dicts, ordered=False)
+        except BulkWriteError as e:
+            errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        self._forget_missing(book_dicts)
+
+        await book_stats_repository.apply(
+            [book_dict for index, book_dict in enumerate(book_dicts) if index not in errors], 1
+        )
+        await book_total_counter.add(len(book_dicts) - len(errors))
+        await self._catalog_changed()
+        return errors
+    
+    async def _insert_coalesced(self, book_dicts: List[dict]) -> List[Any]:
+        errors = await self._insert_many(book_dicts)
+        return [
+            WriteError(errors[index].get("errmsg", "write error"), errors[index].get("code"), errors[index])
+            if index in errors else book_dict["_id"]
+            for index, book_dict in enumerate(book_dicts)
+        ]
+    
     async def create_book(self, book_data: BookCreate) -> Book:
         book_dict = book_data.model_dump()
-        result = await self.collection.insert_one(book_dict)
+        if self.insert_coalescer:
+            await self.insert_coalescer.submit(book_dict)
+        else:
+            await self.collection.insert_one(book_dict)
+            self._forget_missing([book_dict])
+            await book_stats_repository.apply([book_dict], 1)
+            await book_total_counter.add(1)
+            await self._catalog_changed()
         
-        created_book = await self.collection.find_one({"_id": result.inserted_id})
-        created_book["_id"] = str(created_book["_id"])
-        return Book(**created_book)
+        return _to_book(book_dict, None)
+    
+    async def create_books(self, books_data: List[BookCreate]) -> List[BookBulkItemResult]:
+        book_dicts = [book_data.model_dump() for book_data in books_data]
+        errors = await self._insert_many(book_dicts)
+
+        return [
+            BookBulkItemResult(index=index, error=errors[index].get("errmsg", "write error"), created=False)
+            if index in errors else
+            BookBulkItemResult(index=index, id=str(book_dict["_id"]), created=True)
+            for index, book_dict in enumerate(book_dicts)
+        ]
     
     async def get_all_books(self) -> List[Book]:
         books = []
-        cursor = self.collection.find({})
+        cursor = self.catalog_collection.find({})
         async for book_doc in cursor:
-            book_doc["_id"] = str(book_doc["_id"])
-            books.append(Book(**book_doc))
+            books.append(_to_book(book_doc, None))
         return books
     
-    async def get_book_by_id(self, book_id: str) -> Optional[Book]:
-        try:
-            book_doc = await self.collection.find_one({"_id": ObjectId(book_id)})
-            if book_doc:
-                book_doc["_id"] = str(book_doc["_id"])
-                return Book(**book_doc)
+    def _page_cursor(
+        self,
+        collection: AsyncIOMotorCollection,
+        limit: int,
+        after: Optional[str],
+        fields: Optional[Sequence[str]],
+        query: BookListQuery
+    ):
+        sort_field, direction = _sort_spec(query.sort)
+        mongo_filter = _book_filter(query)
+
+        if after:
+            position = decode_cursor(after, BOOK_FIELD_TYPES.get(sort_field))
+            if position.get("s", "_id") != query.sort:
+                raise InvalidCursorError("Курсор пагінації не відповідає параметру sort")
+
+            op = "$gt" if direction == ASCENDING else "$lt"
+            if sort_field == "_id":
+                keyset = {"_id": {op: position["id"]}}
+            else:
+                keyset = {"$or": [
+                    {sort_field: {op: position.get("v")}},
+                    {sort_field: position.get("v"), "_id": {op: position["id"]}}
+                ]}
+            mongo_filter = {"$and": [mongo_filter, keyset]} if mongo_filter else keyset
+
+        sort = [(sort_field, direction)]
+        if sort_field != "_id":
+            sort.append(("_id", direction))
+
+        projection = _projection(fields)
+        if projection and sort_field != "_id":
+            projection[sort_field] = 1
+
+        return collection.find(mongo_filter, projection).sort(sort).limit(limit + 1)
+
+    async def get_books_page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        query: Optional[BookListQuery] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        query = query or BookListQuery()
+        params = {"limit": limit, "after": after, "fields": fields, "query": query.model_dump()}
+        books, next_cursor = await catalog_cache.get_or_load(
+            "page", params, lambda: self._load_books_page(limit, after, fields, query)
+        )
+        return books, next_cursor
+
+    async def _load_books_page(
+        self,
+        limit: int,
+        after: Optional[str],
+        fields: Optional[Sequence[str]],
+        query: BookListQuery
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        sort_field, _ = _sort_spec(query.sort)
+
+        collection = await catalog_cache.fill_collection(self.collection_name)
+        book_docs = await self._page_cursor(collection, limit, after, fields, query).to_list(length=limit + 1)
+
+        next_cursor = None
+        if len(book_docs) > limit:
+            book_docs = book_docs[:limit]
+            last_doc = book_docs[-1]
+            position = {"id": str(last_doc["_id"]), "s": query.sort}
+            if sort_field != "_id":
+                position["v"] = last_doc.get(sort_field)
+            next_cursor = encode_cursor(position)
+
+        books = []
+        for book_doc in book_docs:
+            if fields and sort_field != "_id" and sort_field not in fields:
+                book_doc.pop(sort_field, None)
+            books.append(_to_book_dict(book_doc, fields, self.trusted_reads))
+        return books, next_cursor
+
+    async def count_books(self, query: Optional[BookListQuery] = None, strategy: str = "exact") -> int:
+        query = query or BookListQuery()
+        if strategy == "cached":
+            return await self._count_books(query, strategy)
+        params = {"query": query.model_dump(), "strategy": strategy}
+        return await catalog_cache.get_or_load("count", params, lambda: self._count_books(query, strategy))
+
+    async def _count_books(self, query: BookListQuery, strategy: str) -> int:
+        mongo_filter = _book_filter(query)
+        # estimated і cached рахують лише всю колекцію, для фільтрів потрібен count_documents
+        if mongo_filter or strategy == "exact":
+            collection = await catalog_cache.fill_collection(self.collection_name)
+            return await collection.count_documents(mongo_filter)
+        if strategy == "cached":
+            return await book_total_counter.get(self._estimated_count)
+        return await self._estimated_count()
+    
+    async def _estimated_count(self) -> int:
+        collection = await catalog_cache.fill_collection(self.collection_name)
+        return await collection.estimated_document_count()
+
+    async def explain_books_page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        query: Optional[BookListQuery] = None
+    ) -> Dict[str, Any]:
+        plan = await self._page_cursor(self.catalog_collection, limit, after, fields, query or BookListQuery()).explain()
+        winning_plan = plan["queryPlanner"]["winningPlan"]
+        stages = _plan_stages(winning_plan.get("queryPlan", winning_plan))
+        return {
+            "stages": stages,
+            "indexes": [stage["index"] for stage in stages if stage["index"]],
+            "collscan": any(stage["stage"] == "COLLSCAN" for stage in stages),
+            "winning_plan": winning_plan
+        }
+    
+    async def export_books(self, batch_size: int, fields: Optional[Sequence[str]] = None) -> AsyncIterator[bytes]:
+        cursor = self.catalog_collection.find({}, _projection(fields)).sort("_id", ASCENDING).batch_size(batch_size)
+        lines = []
+        async for book_doc in cursor:
+            book_id = str(book_doc.pop("_id"))
+            lines.append(json.dumps({"id": book_id, **book_doc}, ensure_ascii=False))
+            if len(lines) >= batch_size:
+                yield ("\n".join(lines) + "\n").encode("utf-8")
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+    
+    def may_exist(self, book_id: str) -> bool:
+        """Перевірка без I/O: False для невалідного ObjectId або id, якого нещодавно не знайшли."""
+        if not ObjectId.is_valid(book_id):
+            return False
+        return self.missing_books.get(str(ObjectId(book_id))) is None
+    
+    async def get_book_by_id(
+        self,
+        book_id: str,
+        fields: Optional[Sequence[str]] = None,
+        generation: Optional[int] = None,
+        checked: bool = False
+    ) -> Optional[Union[Book, BookPartial]]:
+        """generation — покоління каталогу, для якого потрібна книга. Записи book_cache
+        з іншого покоління не використовуються: інвалідація через pub/sub асинхронна.
+        checked=True означає, що may_exist уже викликано і повторно перевіряти не треба."""
+        if not checked and not self.may_exist(book_id):
+            return None
+
+        object_id = ObjectId(book_id)
+        entry = self.book_cache.get(str(object_id))
+        if entry is not None and (generation is None or entry[0] == generation):
+            book_doc = entry[1]
+        else:
+            book_doc = await self.single_flight.do(
+                ("book", str(object_id), generation),
+                lambda: self._load_book(object_id, generation)
+            )
+            if not book_doc:
+                return None
+
+        if fields:
+            book_doc = {field: book_doc[field] for field in ("_id", *fields) if field in book_doc}
+        return _to_book(dict(book_doc), fields)
+    
+    async def _load_book(self, object_id: ObjectId, catalog_generation: Optional[int]) -> Optional[Dict[str, Any]]:
+        # catalog_generation прочитано до find_one, тож документ не старіший за нього
+        generation = self.book_cache.generation
+        missing_generation = self.missing_books.generation
+        book_doc = await self.collection.find_one({"_id": object_id})
+        if book_doc:
+            book_doc["_id"] = str(book_doc["_id"])
+            self.book_cache.set(book_doc["_id"], (catalog_generation, book_doc), generation=generation)
+        else:
+            self.missing_books.set(str(object_id), True, generation=missing_generation)
+        return book_doc
+    
+    async def get_books_by_ids(
+        self,
+        book_ids: List[str],
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        object_ids = {book_id: ObjectId(book_id) for book_id in book_ids if ObjectId.is_valid(book_id)}
+
+        found = {}
+        if object_ids:
+            cursor = self.catalog_collection.find({"_id": {"$in": list(set(object_ids.values()))}}, _projection(fields))
+            async for book_doc in cursor:
+                book = _to_book_dict(book_doc, fields, self.trusted_reads)
+                found[book["id"]] = book
+
+        books, missing = [], []
+        for book_id in book_ids:
+            book = found.get(str(object_ids[book_id])) if book_id in object_ids else None
+            if book:
+                books.append(book)
+            else:
+                missing.append(book_id)
+        return books, missing
+    
+    async def update_book(self, book_id: str, changes: Dict[str, Any]) -> Optional[Book]:
+        if not ObjectId.is_valid(book_id):
             return None
-        except:
+
+        # BEFORE замість AFTER: стара версія потрібна для статистики, нову отримуємо накладанням $set
+        old_doc = await self.collection.find_one_and_update(
+            {"_id": ObjectId(book_id)},
+            {"$set": changes},
+            return_document=ReturnDocument.BEFORE
+        )
+        if old_doc is None:
             return None
+
+        new_doc = {**old_doc, **changes}
+        await book_stats_repository.move(old_doc, new_doc)
+        await cache_invalidation.publish("book", str(old_doc["_id"]))
+        await self._catalog_changed()
+        return _to_book(new_doc, None)
     
-    async def delete_book(self, book_id: str) -> bool:
-        try:
-            result = await self.collection.delete_one({"_id": ObjectId(book_id)})
-            return result.deleted_count > 0
-        except:
-            return False
+    async def delete_book(self, book_id: str) -> Optional[Book]:
+        if not ObjectId.is_valid(book_id):
+            return None
+
+        deleted_doc = await self.collection.find_one_and_delete({"_id": ObjectId(book_id)})
+        if deleted_doc is None:
+            return None
+
+        await book_stats_repository.apply([deleted_doc], -1)
+        await book_total_counter.add(-1)
+        await cache_invalidation.publish("book", str(deleted_doc["_id"]))
+        await self._catalog_changed()
+        return _to_book(deleted_doc, None)
 
 book_repository = BookRepository()
\ No newline at end of file
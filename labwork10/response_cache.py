@@ -0,0 +1,38 @@
+import json
+from typing import Any, Dict, Optional
+from fastapi import Request, Response
+from local_cache import LRUTTLCache
+from etag import etag_matches, not_modified
+from config import settings
+
+class ResponseCache:
+    """Кеш готових тіл JSON-відповідей у пам'яті процесу. Ключем є ETag, який уже
+    містить покоління каталогу, маршрут, query і варіант відповіді."""
+
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        self.cache = LRUTTLCache(
+            max_entries or settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl or settings.RESPONSE_CACHE_TTL
+        )
+    
+    def lookup(self, request: Request, etag: Optional[str], headers: Optional[Dict[str, str]] = None) -> Optional[Response]:
+        if not etag:
+            return None
+        if etag_matches(request, etag):
+            return not_modified(etag, headers)
+
+        cached = self.cache.get(etag)
+        if cached is None:
+            return None
+        body, headers = cached
+        return Response(content=body, media_type="application/json", headers=headers)
+    
+    def respond(self, etag: Optional[str], content: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+        body = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=str).encode("utf-8")
+        headers = dict(headers or {})
+        if etag:
+            headers["ETag"] = etag
+            self.cache.set(etag, (body, headers))
+        return Response(content=body, media_type="application/json", headers=headers)
+
+response_cache = ResponseCache()
@@ -1,66 +1,262 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Request
-from typing import Dict, Any, Optional
-from models import Book, BookCreate, User
+import asyncio
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, Optional
+from models import Book, BookCreate, BookUpdate, BookPartial, BookBatchGet, BookListQuery, BOOK_SORT_FIELDS, BookBulkCreate, BookBulkCreateResponse, User, BOOK_FIELDS
 from repository import book_repository
+from stats_repository import book_stats_repository
 from auth import get_current_active_user, get_current_user_optional
 from rate_limiter import rate_limiter
+from pagination import InvalidCursorError
+from etag import catalog_etag, current_generation, generation_etag
+from response_cache import response_cache
+from config import settings
 
 router = APIRouter(prefix="/api/v1", tags=["books"])
 
+PageLimit = Query(default=settings.BOOKS_PAGE_SIZE, ge=1, le=settings.BOOKS_PAGE_SIZE_MAX)
+CountStrategy = Query(
+    default=settings.BOOKS_COUNT_STRATEGY,
+    pattern="^(none|exact|estimated|cached)$",
+    description="Як рахувати total: none, exact, estimated або cached"
+)
+
+def book_fields(
+    fields: Optional[str] = Query(default=None, description="Поля через кому, напр. title,author")
+) -> Optional[List[str]]:
+    if not fields:
+        return None
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in BOOK_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Невідомі поля: {', '.join(unknown)}. Доступні: {', '.join(BOOK_FIELDS)}"
+        )
+    return requested or None
+
+def book_list_query(
+    author: Optional[str] = None,
+    genre: Optional[str] = None,
+    year_from: Optional[int] = Query(default=None, ge=1000, le=2025),
+    year_to: Optional[int] = Query(default=None, ge=1000, le=2025),
+    sort: str = Query(
+        default="_id",
+        pattern=f"^-?({'|'.join(BOOK_SORT_FIELDS)})$",
+        description="Поле сортування, '-' для спадання, напр. -year_published"
+    )
+) -> BookListQuery:
+    if year_from is not None and year_to is not None and year_from > year_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="year_from не може бути більшим за year_to"
+        )
+    return BookListQuery(author=author, genre=genre, year_from=year_from, year_to=year_to, sort=sort)
+
+async def _get_books_page(
+    request: Request,
+    limit: int,
+    after: Optional[str],
+    fields: Optional[List[str]],
+    query: BookListQuery,
+    count_strategy: str
+) -> Dict[str, Any]:
+    page = book_repository.get_books_page(limit, after, fields, query)
+    try:
+        if count_strategy == "none":
+            (books, next_cursor), total = await page, None
+        else:
+            (books, next_cursor), total = await asyncio.gather(
+                page, book_repository.count_books(query, count_strategy)
+            )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    next_link = None
+    if next_cursor:
+        next_link = str(request.url.include_query_params(after=next_cursor))
+
+    result = {
+        "count": len(books),
+        "books": books,
+        "next": next_link
+    }
+    if total is not None:
+        result["total"] = total
+    return result
+
+def _total_headers(result: Dict[str, Any]) -> Dict[str, str]:
+    if "total" in result:
+        return {"X-Total-Count": str(result["total"])}
+    return {}
+
+def _public_cache_headers() -> Dict[str, str]:
+    return {
+        "Cache-Control": (
+            f"public, max-age={settings.PUBLIC_CACHE_MAX_AGE}, "
+            f"stale-while-revalidate={settings.PUBLIC_CACHE_STALE_WHILE_REVALIDATE}"
+        ),
+        "Vary": "Accept-Encoding"
+    }
+
 @router.get("/books/public", response_model=Dict[str, Any])
 async def get_all_books_public(
     request: Request,
+    limit: int = PageLimit,
+    after: Optional[str] = None,
+    fields: Optional[List[str]] = Depends(book_fields),
+    query: BookListQuery = Depends(book_list_query),
+    count_strategy: str = CountStrategy,
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
-
+    # Тіло однакове для всіх, тож його можуть кешувати проксі та CDN;
+    # дані про користувача віддає /books/public/viewer
     user_id = current_user.id if current_user else None
     await rate_limiter.check_rate_limit(request, user_id)
     
-    books = await book_repository.get_all_books()
-    response = {
-        "count": len(books),
-        "books": [book.model_dump() for book in books]
-    }
+    cache_headers = _public_cache_headers()
+    etag = await catalog_etag(request)
+    cached = response_cache.lookup(request, etag, cache_headers)
+    if cached:
+        return cached
     
+    result = await _get_books_page(request, limit, after, fields, query, count_strategy)
+    return response_cache.respond(etag, result, {**_total_headers(result), **cache_headers})
+
+@router.get("/books/public/viewer", response_model=Dict[str, Any])
+async def get_public_viewer(
+    response: Response,
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    response.headers["Cache-Control"] = "private, no-store"
     if current_user:
-        response["user"] = current_user.username
-        response["user_type"] = "authenticated"
-    else:
-        response["user_type"] = "anonymous"
-    
-    return response
+        return {"user": current_user.username, "user_type": "authenticated"}
+    return {"user": None, "user_type": "anonymous"}
 
 @router.get("/books", response_model=Dict[str, Any])
 async def get_all_books(
     request: Request,
+    limit: int = PageLimit,
+    after: Optional[str] = None,
+    fields: Optional[List[str]] = Depends(book_fields),
+    query: BookListQuery = Depends(book_list_query),
+    count_strategy: str = CountStrategy,
+    explain: bool = Query(default=False, description="Додати план запиту MongoDB (explain) у відповідь"),
+    current_user: User = Depends(get_current_active_user)
+):
+
+    await rate_limiter.check_rate_limit(request, current_user.id)
+    
+    etag = None if explain else await catalog_etag(request, current_user.username)
+    cached = response_cache.lookup(request, etag)
+    if cached:
+        return cached
+    
+    result = await _get_books_page(request, limit, after, fields, query, count_strategy)
+    result["user"] = current_user.username
+    if explain:
+        result["explain"] = await book_repository.explain_books_page(limit, after, fields, query)
+    return response_cache.respond(etag, result, _total_headers(result))
+
+@router.get("/books/load-test", response_model=Dict[str, Any])
+async def get_books_for_load_test(
+    request: Request,
+    limit: int = PageLimit,
+    after: Optional[str] = None,
+    fields: Optional[List[str]] = Depends(book_fields),
+    query: BookListQuery = Depends(book_list_query),
+    count_strategy: str = CountStrategy
+):
+    """Ендпоінт для load testing - БЕЗ rate limiter та БЕЗ автентифікації"""
+    etag = await catalog_etag(request)
+    cached = response_cache.lookup(request, etag)
+    if cached:
+        return cached
+    
+    result = await _get_books_page(request, limit, after, fields, query, count_strategy)
+    result["message"] = "Load testing endpoint - no rate limiting"
+    result["endpoint"] = "/api/v1/books/load-test"
+    return response_cache.respond(etag, result, _total_headers(result))
+
+@router.get("/books/export")
+async def export_books(
+    request: Request,
+    batch_size: int = Query(default=settings.BOOKS_EXPORT_BATCH_SIZE, ge=1, le=10000),
+    fields: Optional[List[str]] = Depends(book_fields),
     current_user: User = Depends(get_current_active_user)
 ):
 
     await rate_limiter.check_rate_limit(request, current_user.id)
     
-    books = await book_repository.get_all_books()
+    return StreamingResponse(
+        book_repository.export_books(batch_size, fields),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="books.ndjson"'}
+    )
+
+@router.get("/books/stats", response_model=Dict[str, Any])
+async def get_books_stats(
+    request: Request,
+    top_authors: int = Query(default=20, ge=1, le=1000),
+    current_user: User = Depends(get_current_active_user)
+):
+
+    await rate_limiter.check_rate_limit(request, current_user.id)
+    
+    return await book_stats_repository.get_stats(top_authors)
+
+@router.post("/books/batch-get", response_model=Dict[str, Any])
+async def get_books_batch(
+    batch_data: BookBatchGet,
+    request: Request,
+    fields: Optional[List[str]] = Depends(book_fields),
+    current_user: User = Depends(get_current_active_user)
+):
+
+    await rate_limiter.check_rate_limit(request, current_user.id)
+    
+    books, missing = await book_repository.get_books_by_ids(batch_data.ids, fields)
     return {
         "count": len(books),
-        "books": [book.model_dump() for book in books],
-        "user": current_user.username
+        "books": books,
+        "missing": missing
     }
 
-@router.get("/books/{book_id}", response_model=Book)
+@router.get("/books/{book_id}", response_model=BookPartial, response_model_exclude_unset=True)
 async def get_book(
     book_id: str, 
     request: Request,
+    fields: Optional[List[str]] = Depends(book_fields),
     current_user: User = Depends(get_current_active_user)
 ):
 
     await rate_limiter.check_rate_limit(request, current_user.id)
     
-    book = await book_repository.get_book_by_id(book_id)
+    if not book_repository.may_exist(book_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Книгу з ID {book_id} не знайдено"
+        )
+    
+    # Книга читається для того самого покоління, що й у ETag, інакше в кеш відповідей
+    # під новим ETag могла б потрапити версія книги до запису
+    generation = await current_generation()
+    etag = generation_etag(request, generation)
+    cached = response_cache.lookup(request, etag)
+    if cached:
+        return cached
+    
+    book = await book_repository.get_book_by_id(book_id, fields, generation, checked=True)
     if not book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Книгу з ID {book_id} не знайдено"
         )
-    return book
+    return response_cache.respond(etag, book.model_dump(by_alias=True, exclude_unset=True))
 
 @router.post("/books", response_model=Book, status_code=status.HTTP_201_CREATED)
 async def create_book(
@@ -73,40 +269,83 @@ async def create_book(
     
     return await book_repository.create_book(book_data)
 
-@router.delete("/books/{book_id}")
-async def delete_book(
-    book_id: str, 
+@router.post("/books/bulk", response_model=BookBulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_books_bulk(
+    bulk_data: BookBulkCreate,
     request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user)
 ):
 
     await rate_limiter.check_rate_limit(request, current_user.id)
     
-    book = await book_repository.get_book_by_id(book_id)
+    results = await book_repository.create_books(bulk_data.books)
+    inserted = sum(1 for result in results if result.created)
+    if inserted < len(results):
+        response.status_code = status.HTTP_207_MULTI_STATUS
+    
+    return BookBulkCreateResponse(
+        inserted=inserted,
+        failed=len(results) - inserted,
+        results=results
+    )
+
+async def _update_book(book_id: str, changes: Dict[str, Any]) -> Book:
+    book = await book_repository.update_book(book_id, changes)
     if not book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Книгу з ID {book_id} не знайдено"
         )
+    return book
+
+@router.put("/books/{book_id}", response_model=Book)
+async def replace_book(
+    book_id: str,
+    book_data: BookCreate,
+    request: Request,
+    current_user: User = Depends(get_current_active_user)
+):
+
+    await rate_limiter.check_rate_limit(request, current_user.id)
+    
+    return await _update_book(book_id, book_data.model_dump())
+
+@router.patch("/books/{book_id}", response_model=Book)
+async def update_book(
+    book_id: str,
+    book_data: BookUpdate,
+    request: Request,
+    current_user: User = Depends(get_current_active_user)
+):
+
+    await rate_limiter.check_rate_limit(request, current_user.id)
     
-    deleted = await book_repository.delete_book(book_id)
-    if not deleted:
+    changes = book_data.model_dump(exclude_unset=True)
+    if not changes or any(value is None for value in changes.values()):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Помилка при видаленні"
+            detail="Потрібно передати хоча б одне поле для оновлення, null не допускається"
+        )
+    
+    return await _update_book(book_id, changes)
+
+@router.delete("/books/{book_id}")
+async def delete_book(
+    book_id: str, 
+    request: Request,
+    current_user: User = Depends(get_current_active_user)
+):
+
+    await rate_limiter.check_rate_limit(request, current_user.id)
+    
+    book = await book_repository.delete_book(book_id)
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Книгу з ID {book_id} не знайдено"
         )
     
     return {
         "message": f"Книгу '{book.title}' видалено користувачем {current_user.username}"
     }
-
-@router.get("/books/load-test", response_model=Dict[str, Any])
-async def get_books_for_load_test():
-    """Ендпоінт для load testing - БЕЗ rate limiter та БЕЗ автентифікації"""
-    books = await book_repository.get_all_books()
-    return {
-        "count": len(books),
-        "books": [book.model_dump() for book in books],
-        "message": "Load testing endpoint - no rate limiting",
-        "endpoint": "/api/v1/books/load-test"
-    }
\ No newline at end of file
@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Об'єднує одночасні виклики з однаковим ключем: перший виклик запускає load,
+    решта чекають на той самий результат (або виняток), а не повторюють запит."""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+    
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(load())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        else:
+            self.coalesced += 1
+        # shield: скасування одного з клієнтів не повинно скасовувати запит для інших
+        return await asyncio.shield(task)
+    
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Позначаємо виняток як отриманий, навіть якщо всі клієнти вже пішли
+            task.exception()
+    
+    def forget(self):
+        """Нові виклики не приєднуватимуться до запитів, що вже виконуються.
+        Викликається після запису, щоб читання після нього не отримало старих даних."""
+        self._in_flight.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "coalesced_rate": round(self.coalesced / self.calls, 4) if self.calls else 0.0
+        }
@@ -0,0 +1,117 @@
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from typing import Any, Dict, List, Tuple
+from database import get_database, get_collection, connect_to_mongo, close_mongo_connection
+from catalog_cache import catalog_cache
+
+STATS_KINDS = ("genre", "decade", "author")
+
+def _decade(year_published: int) -> str:
+    return str(year_published - year_published % 10)
+
+def _buckets(book_doc: dict) -> List[Dict[str, str]]:
+    return [
+        {"kind": "total", "key": "all"},
+        {"kind": "genre", "key": book_doc["genre"]},
+        {"kind": "decade", "key": _decade(book_doc["year_published"])},
+        {"kind": "author", "key": book_doc["author"]},
+    ]
+
+class BookStatsRepository:
+    indexes = [
+        IndexModel([("kind", ASCENDING), ("key", ASCENDING)], name="kind_key_unique", unique=True),
+        IndexModel([("kind", ASCENDING), ("count", DESCENDING)], name="kind_count"),
+    ]
+
+    def __init__(self, source_collection_name: str = "books"):
+        self.collection_name = "book_stats"
+        self.source_collection_name = source_collection_name
+    
+    @property
+    def collection(self) -> AsyncIOMotorCollection:
+        return get_database()[self.collection_name]
+    
+    @property
+    def catalog_collection(self) -> AsyncIOMotorCollection:
+        return get_collection(self.collection_name, "catalog")
+    
+    async def apply(self, book_docs: List[dict], delta: int):
+        await self._increment([(book_doc, delta) for book_doc in book_docs])
+    
+    async def move(self, old_doc: dict, new_doc: dict):
+        await self._increment([(old_doc, -1), (new_doc, 1)])
+    
+    async def _increment(self, changes: List[Tuple[dict, int]]):
+        increments = {}
+        for book_doc, delta in changes:
+            for bucket in _buckets(book_doc):
+                bucket_key = (bucket["kind"], bucket["key"])
+                increments[bucket_key] = increments.get(bucket_key, 0) + delta
+
+        increments = {bucket_key: count for bucket_key, count in increments.items() if count}
+        if not increments:
+            return
+
+        await self.collection.bulk_write([
+            UpdateOne({"kind": kind, "key": key}, {"$inc": {"count": count}}, upsert=True)
+            for (kind, key), count in increments.items()
+        ], ordered=False)
+    
+    async def get_stats(self, top_authors: int = 20) -> Dict[str, Any]:
+        return await catalog_cache.get_or_load(
+            "stats", {"top_authors": top_authors}, lambda: self._load_stats(top_authors)
+        )
+    
+    async def _load_stats(self, top_authors: int) -> Dict[str, Any]:
+        stats = {"total": 0, "genre": {}, "decade": {}, "author": {}}
+
+        collection = await catalog_cache.fill_collection(self.collection_name)
+        total_doc = await collection.find_one({"kind": "total", "key": "all"})
+        if total_doc:
+            stats["total"] = total_doc["count"]
+
+        for kind in STATS_KINDS:
+            cursor = collection.find({"kind": kind, "count": {"$gt": 0}}).sort("count", DESCENDING)
+            if kind == "author":
+                cursor = cursor.limit(top_authors)
+            async for bucket in cursor:
+                stats[kind][bucket["key"]] = bucket["count"]
+
+        stats["decade"] = dict(sorted(stats["decade"].items()))
+        return stats
+    
+    async def rebuild(self):
+        pipeline = [
+            {"$project": {"_id": 0, "buckets": [
+                {"kind": "total", "key": "all"},
+                {"kind": "genre", "key": "$genre"},
+                {"kind": "decade", "key": {"$toString": {
+                    "$subtract": ["$year_published", {"$mod": ["$year_published", 10]}]
+                }}},
+                {"kind": "author", "key": "$author"}
+            ]}},
+            {"$unwind": "$buckets"},
+            {"$group": {"_id": "$buckets", "count": {"$sum": 1}}},
+            {"$project": {"_id": 0, "kind": "$_id.kind", "key": "$_id.key", "count": 1}},
+            {"$out": self.collection_name}
+        ]
+        source = get_database()[self.source_collection_name]
+        async for _ in source.aggregate(pipeline):
+            pass
+
+book_stats_repository = BookStatsRepository()
+
+async def rebuild_stats():
+    await connect_to_mongo()
+    try:
+        await book_stats_repository.rebuild()
+        stats = await book_stats_repository._load_stats(20)
+        print(f"Статистику перераховано: {stats['total']} книг")
+        print(f"Жанри: {stats['genre']}")
+        print(f"Десятиліття: {stats['decade']}")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_stats())
@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from book_counter import BookTotalCounter
+
+class TestBookTotalCounter:
+
+    @pytest.fixture
+    def mock_redis(self):
+
+        redis_mock = AsyncMock()
+        redis_mock.get = AsyncMock(return_value=None)
+        redis_mock.set = AsyncMock(return_value=True)
+        redis_mock.script = AsyncMock(return_value=None)
+        redis_mock.register_script = MagicMock(return_value=redis_mock.script)
+        return redis_mock
+
+    @pytest.fixture
+    def mock_redis_client(self, mock_redis):
+
+        client_mock = MagicMock()
+        client_mock.get_client = MagicMock(return_value=mock_redis)
+        return client_mock
+
+    @pytest.fixture
+    def counter(self, mock_redis_client):
+
+        return BookTotalCounter(redis_client_instance=mock_redis_client, ttl=60)
+
+    @pytest.mark.asyncio
+    async def test_cached_total_skips_load(self, counter, mock_redis):
+        mock_redis.get.return_value = "42"
+        load = AsyncMock(return_value=100)
+
+        assert await counter.get(load) == 42
+        load.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_total_is_loaded_and_cached(self, counter, mock_redis):
+        load = AsyncMock(return_value=100)
+
+        assert await counter.get(load) == 100
+        mock_redis.set.assert_called_once_with("books_total", 100, ex=60, nx=True)
+
+    @pytest.mark.asyncio
+    async def test_redis_error_falls_back_to_load(self, counter, mock_redis):
+        mock_redis.get.side_effect = Exception("Redis connection error")
+        load = AsyncMock(return_value=100)
+
+        assert await counter.get(load) == 100
+        mock_redis.set.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_add_only_increments_existing_counter(self, counter, mock_redis):
+        await counter.add(3)
+        await counter.add(0)
+
+        mock_redis.script.assert_called_once_with(keys=["books_total"], args=[3])
@@ -0,0 +1,130 @@
+import pytest
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+from catalog_cache import CatalogCache
+
+class TestCatalogCache:
+
+    @pytest.fixture
+    def mock_redis(self):
+
+        store = {"catalog_generation": "7"}
+        redis_mock = AsyncMock()
+        redis_mock.get = AsyncMock(side_effect=lambda key: store.get(key))
+        redis_mock.set = AsyncMock(side_effect=lambda key, value, ex=None: store.__setitem__(key, value))
+        redis_mock.incr = AsyncMock(return_value=8)
+        redis_mock.exists = AsyncMock(side_effect=lambda key: int(key in store))
+        redis_mock.store = store
+        return redis_mock
+
+    @pytest.fixture
+    def cache(self, mock_redis):
+
+        client_mock = MagicMock()
+        client_mock.get_client = MagicMock(return_value=mock_redis)
+        return CatalogCache(redis_client_instance=client_mock, ttl=60, enabled=True, max_staleness=60)
+
+    @pytest.mark.asyncio
+    async def test_miss_then_hit(self, cache):
+        load = AsyncMock(return_value={"books": [1, 2]})
+
+        first = await cache.get_or_load("page", {"limit": 2}, load)
+        second = await cache.get_or_load("page", {"limit": 2}, load)
+
+        assert first == second == {"books": [1, 2]}
+        load.assert_called_once()
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_key_contains_generation(self, cache, mock_redis):
+        await cache.get_or_load("page", {"limit": 2}, AsyncMock(return_value=[]))
+
+        key, value = mock_redis.set.call_args.args
+        assert key.startswith("catalog_cache_7_page_")
+        assert json.loads(value)["v"] == []
+
+    @pytest.mark.asyncio
+    async def test_redis_error_falls_back_to_load(self, cache, mock_redis):
+        mock_redis.get.side_effect = Exception("Redis connection error")
+        load = AsyncMock(return_value=[1])
+
+        assert await cache.get_or_load("page", {}, load) == [1]
+        assert cache.stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_served_and_refreshed(self, cache, mock_redis, monkeypatch):
+        await cache.get_or_load("page", {"limit": 2}, AsyncMock(return_value=["old"]))
+
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 61)
+        load = AsyncMock(return_value=["new"])
+
+        assert await cache.get_or_load("page", {"limit": 2}, load) == ["old"]
+        await asyncio.sleep(0)
+        assert await cache.get_or_load("page", {"limit": 2}, load) == ["new"]
+        load.assert_called_once()
+        assert cache.stats()["stale_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_hot_loads_new_generation(self, cache, mock_redis):
+        load = AsyncMock(return_value=[1])
+        await cache.get_or_load("page", {"limit": 2}, load)
+
+        mock_redis.store["catalog_generation"] = "8"
+        await cache.refresh_hot()
+
+        assert load.await_count == 2
+        assert any(key.startswith("catalog_cache_8_page_") for key in mock_redis.store)
+        assert await cache.get_or_load("page", {"limit": 2}, load) == [1]
+        assert load.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self, cache):
+        release = asyncio.Event()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return ["page"]
+
+        waiters = [asyncio.create_task(cache.get_or_load("page", {"limit": 2}, load)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        release.set()
+
+        assert await asyncio.gather(*waiters) == [["page"]] * 5
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_read_after_bump_does_not_join_older_load(self, cache, mock_redis):
+        release = asyncio.Event()
+
+        async def old_load():
+            await release.wait()
+            return ["old"]
+
+        in_flight = asyncio.create_task(cache.get_or_load("page", {"limit": 2}, old_load))
+        await asyncio.sleep(0.01)
+
+        # Запис на іншому воркері: покоління змінилося, forget() тут не викликався
+        mock_redis.store["catalog_generation"] = "8"
+        fresh = await cache.get_or_load("page", {"limit": 2}, AsyncMock(return_value=["new"]))
+        release.set()
+
+        assert fresh == ["new"]
+        assert await in_flight == ["old"]
+
+    @pytest.mark.asyncio
+    async def test_fill_reads_primary_only_after_write(self, cache, mock_redis, monkeypatch):
+        monkeypatch.setattr("catalog_cache.get_collection", lambda name, profile: profile)
+
+        assert await cache.fill_collection("books") == "catalog"
+
+        await cache.bump()
+
+        assert mock_redis.set.call_args.kwargs["ex"] == cache.primary_fill_window
+        assert await cache.fill_collection("books") == "primary"
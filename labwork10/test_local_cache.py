@@ -0,0 +1,35 @@
+import time
+from local_cache import LRUTTLCache
+
+class TestLRUTTLCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUTTLCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_expired_entry_is_a_miss(self, monkeypatch):
+        cache = LRUTTLCache(max_entries=10, ttl=5)
+        cache.set("a", 1)
+
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_fill_started_before_invalidation_is_dropped(self):
+        cache = LRUTTLCache(max_entries=10, ttl=60)
+        generation = cache.generation
+
+        cache.invalidate("a")
+        cache.set("a", "stale", generation=generation)
+
+        assert cache.get("a") is None
@@ -0,0 +1,32 @@
+import pytest
+from bson import ObjectId
+from pagination import encode_cursor, decode_cursor, InvalidCursorError
+
+class TestPagination:
+
+    def test_cursor_round_trip(self):
+        book_id = str(ObjectId())
+
+        cursor = encode_cursor({"id": book_id})
+        payload = decode_cursor(cursor)
+
+        assert payload["id"] == ObjectId(book_id)
+        assert "=" not in cursor, "Курсор повинен бути безпечним для query string"
+
+    @pytest.mark.parametrize("cursor", ["zzz", "", "e30", encode_cursor({"id": "not-an-object-id"})])
+    def test_invalid_cursor(self, cursor):
+
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor)
+
+    @pytest.mark.parametrize("value", [{"$ne": None}, {"$regex": ".*"}, ["Кобзар"], None, 1990, True])
+    def test_tampered_sort_value(self, value):
+        cursor = encode_cursor({"id": str(ObjectId()), "s": "title", "v": value})
+
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, str)
+
+    def test_sort_value_of_field_type(self):
+        cursor = encode_cursor({"id": str(ObjectId()), "s": "year_published", "v": 1990})
+
+        assert decode_cursor(cursor, int)["v"] == 1990
@@ -0,0 +1,70 @@
+import pytest
+import asyncio
+import time
+import password_utils
+from passlib.hash import bcrypt
+from password_utils import PasswordHasher, PasswordHasherBusy, calibrate_bcrypt_rounds, verify_and_rehash
+
+class TestPasswordHasher:
+
+    @pytest.fixture
+    def hasher(self):
+        hasher = PasswordHasher(workers=1, max_queue=1)
+        yield hasher
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_event_loop_keeps_running_while_hashing(self, hasher):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await hasher._run(time.sleep, 0.2)
+        task.cancel()
+
+        assert ticks >= 10
+
+    @pytest.mark.asyncio
+    async def test_rejects_over_queue_limit(self, hasher):
+        running = [asyncio.create_task(hasher._run(time.sleep, 0.1)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(PasswordHasherBusy):
+            await hasher._run(time.sleep, 0.1)
+
+        await asyncio.gather(*running)
+        assert hasher.stats()["rejected"] == 1
+        assert hasher.stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self, hasher):
+        hashed = await hasher.hash("secret1")
+
+        assert await hasher.verify("secret1", hashed)
+        assert not await hasher.verify("wrong", hashed)
+
+class TestBcryptRounds:
+
+    def test_calibration_doubles_per_round(self, monkeypatch):
+        monkeypatch.setattr(password_utils, "_time_hash", lambda hasher: 6.0)
+
+        assert calibrate_bcrypt_rounds(target_ms=50, min_rounds=10, max_rounds=16) == 13
+        assert calibrate_bcrypt_rounds(target_ms=5, min_rounds=10, max_rounds=16) == 10
+        assert calibrate_bcrypt_rounds(target_ms=10000, min_rounds=10, max_rounds=16) == 16
+
+    def test_rehash_only_cheaper_hashes(self, monkeypatch):
+        monkeypatch.setattr(password_utils, "pwd_context", password_utils._make_context(5))
+        cheaper_hash = bcrypt.using(rounds=4).hash("secret1")
+        costlier_hash = bcrypt.using(rounds=6).hash("secret1")
+
+        ok, new_hash = verify_and_rehash("secret1", cheaper_hash)
+        assert ok
+        assert new_hash.startswith("$2b$05$")
+        assert verify_and_rehash("secret1", new_hash) == (True, None)
+        assert verify_and_rehash("secret1", costlier_hash) == (True, None)
+        assert verify_and_rehash("wrong", cheaper_hash) == (False, None)
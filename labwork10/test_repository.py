@@ -0,0 +1,132 @@
+import pytest
+import pytest_asyncio
+import fakeredis.aioredis
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+import database
+from redis_client import redis_client
+from models import BookCreate, BookListQuery
+from pagination import encode_cursor, decode_cursor, InvalidCursorError
+from repository import book_repository
+from stats_repository import book_stats_repository
+
+TITLES = ["Кобзар", "Кобзар", "Кобзар", "Лісова пісня", "Лісова пісня", "Тіні", "Тіні"]
+
+class TestBookRepository:
+
+    @pytest.fixture(autouse=True)
+    def storage(self, monkeypatch):
+
+        client = AsyncMongoMockClient()
+        monkeypatch.setattr(database.db, "client", client)
+        monkeypatch.setattr(database.db, "database", client["test_library"])
+        monkeypatch.setattr(redis_client, "redis", fakeredis.aioredis.FakeRedis(decode_responses=True))
+        book_repository.book_cache.clear()
+        book_repository.missing_books.clear()
+
+    @pytest_asyncio.fixture
+    async def books(self):
+        books = [
+            BookCreate(title=title, author=f"Автор {i % 2}", year_published=1990 + i, genre=f"genre-{i % 3}")
+            for i, title in enumerate(TITLES)
+        ]
+        results = await book_repository.create_books(books)
+        return [dict(book.model_dump(), id=result.id) for book, result in zip(books, results)]
+
+    async def page_through(self, sort: str, fields=None):
+        seen, after = [], None
+        for _ in range(len(TITLES) + 2):
+            page, after = await book_repository.get_books_page(2, after, fields, BookListQuery(sort=sort))
+            seen.extend(page)
+            if not after:
+                return seen
+        pytest.fail("Курсор не дійшов до кінця каталогу")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sort", ["title", "-title"])
+    async def test_keyset_over_duplicate_titles(self, books, sort):
+        seen = await self.page_through(sort)
+
+        expected = sorted(books, key=lambda book: (book["title"], ObjectId(book["id"])), reverse=sort.startswith("-"))
+        assert [book["id"] for book in seen] == [book["id"] for book in expected]
+        assert len({book["id"] for book in seen}) == len(books)
+
+    @pytest.mark.asyncio
+    async def test_sort_field_is_stripped_from_projection(self, books):
+        seen = await self.page_through("-title", fields=["author"])
+
+        assert len(seen) == len(books)
+        assert all(set(book) == {"id", "author"} for book in seen)
+
+    @pytest.mark.asyncio
+    async def test_tampered_cursor_is_rejected(self, books):
+        _, after = await book_repository.get_books_page(2, None, None, BookListQuery(sort="title"))
+        position = decode_cursor(after, str)
+        tampered = encode_cursor({"id": str(position["id"]), "s": "title", "v": {"$ne": None}})
+
+        with pytest.raises(InvalidCursorError):
+            await book_repository.get_books_page(2, tampered, None, BookListQuery(sort="title"))
+
+    @pytest.mark.asyncio
+    async def test_update_moves_stats(self, books):
+        book = books[0]
+        before = await book_stats_repository._load_stats(20)
+
+        await book_repository.update_book(book["id"], {"genre": "нова", "year_published": 2015})
+        after = await book_stats_repository._load_stats(20)
+
+        assert after["total"] == before["total"] == len(books)
+        assert after["genre"].get(book["genre"], 0) == before["genre"][book["genre"]] - 1
+        assert after["genre"]["нова"] == 1
+        assert after["decade"]["2010"] == 1
+        assert after["decade"].get("1990", 0) == before["decade"]["1990"] - 1
+
+    @pytest.mark.asyncio
+    async def test_delete_decrements_stats(self, books):
+        book = books[-1]
+        before = await book_stats_repository._load_stats(20)
+
+        deleted = await book_repository.delete_book(book["id"])
+        after = await book_stats_repository._load_stats(20)
+
+        assert deleted.id == book["id"]
+        assert after["total"] == before["total"] - 1
+        assert after["genre"].get(book["genre"], 0) == before["genre"][book["genre"]] - 1
+        assert after["author"][book["author"]] == before["author"][book["author"]] - 1
+        assert await book_repository.delete_book(book["id"]) is None
+
+    @pytest.mark.asyncio
+    async def test_missing_id_is_served_from_negative_cache(self, books):
+        book = books[0]
+        await book_repository.delete_book(book["id"])
+
+        assert await book_repository.get_book_by_id(book["id"]) is None
+        assert not book_repository.may_exist(book["id"])
+
+        # Документ повернувся в обхід репозиторію: негативний запис усе ще відповідає без запиту до Mongo
+        await book_repository.collection.insert_one({"_id": ObjectId(book["id"]), "title": book["title"]})
+        assert await book_repository.get_book_by_id(book["id"]) is None
+
+    @pytest.mark.asyncio
+    async def test_created_ids_leave_negative_cache(self, monkeypatch):
+        forgotten = []
+        invalidate = book_repository.missing_books.invalidate
+
+        def record(key):
+            forgotten.append(key)
+            invalidate(key)
+
+        monkeypatch.setattr(book_repository.missing_books, "invalidate", record)
+
+        results = await book_repository.create_books(
+            [BookCreate(title="Нова", author="Автор", year_published=2000, genre="g") for _ in range(2)]
+        )
+
+        assert forgotten == [result.id for result in results]
+        assert all(book_repository.may_exist(result.id) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_malformed_id_is_rejected_without_lookup(self):
+        assert not book_repository.may_exist("not-an-object-id")
+        assert await book_repository.get_book_by_id("not-an-object-id") is None
+        assert len(book_repository.missing_books) == 0
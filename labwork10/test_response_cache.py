@@ -0,0 +1,35 @@
+import pytest
+import json
+from unittest.mock import MagicMock
+from response_cache import ResponseCache
+
+def make_request(if_none_match=None):
+    request = MagicMock()
+    request.headers = {"if-none-match": if_none_match} if if_none_match else {}
+    return request
+
+class TestResponseCache:
+
+    @pytest.fixture
+    def cache(self):
+        return ResponseCache(max_entries=10, ttl=60)
+
+    def test_hit_returns_same_body_and_headers(self, cache):
+        first = cache.respond('"abc"', {"title": "Кобзар"}, {"X-Total-Count": "1"})
+        cached = cache.lookup(make_request(), '"abc"')
+
+        assert cached.body == first.body
+        assert json.loads(cached.body) == {"title": "Кобзар"}
+        assert cached.headers["ETag"] == '"abc"'
+        assert cached.headers["X-Total-Count"] == "1"
+
+    def test_matching_if_none_match_is_not_modified(self, cache):
+        cache.respond('"abc"', {"title": "Кобзар"})
+
+        assert cache.lookup(make_request('"abc"'), '"abc"').status_code == 304
+
+    def test_without_etag_nothing_is_cached(self, cache):
+        cache.respond(None, {"title": "Кобзар"})
+
+        assert cache.lookup(make_request(), None) is None
+        assert len(cache.cache) == 0
@@ -0,0 +1,79 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+from single_flight import SingleFlight
+
+class TestSingleFlight:
+
+    @pytest.fixture
+    def flight(self):
+        return SingleFlight()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_load(self, flight):
+        release = asyncio.Event()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return [1, 2]
+
+        waiters = [asyncio.create_task(flight.do("page", load)) for _ in range(10)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*waiters) == [[1, 2]] * 10
+        assert calls == 1
+        assert flight.stats()["coalesced"] == 9
+        assert flight.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_error_is_shared_and_not_cached(self, flight):
+        load = AsyncMock(side_effect=RuntimeError("mongo down"))
+
+        results = await asyncio.gather(flight.do("page", load), flight.do("page", load), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        load.assert_called_once()
+
+        load.side_effect = None
+        load.return_value = "ok"
+        assert await flight.do("page", load) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self, flight):
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return "ok"
+
+        first = asyncio.create_task(flight.do("page", load))
+        second = asyncio.create_task(flight.do("page", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "ok"
+
+    @pytest.mark.asyncio
+    async def test_forget_starts_a_fresh_load(self, flight):
+        release = asyncio.Event()
+        load_calls = 0
+
+        async def load():
+            nonlocal load_calls
+            load_calls += 1
+            await release.wait()
+            return load_calls
+
+        first = asyncio.create_task(flight.do("page", load))
+        await asyncio.sleep(0)
+        flight.forget()
+        second = asyncio.create_task(flight.do("page", load))
+        await asyncio.sleep(0)
+        release.set()
+
+        await asyncio.gather(first, second)
+        assert load_calls == 2
@@ -0,0 +1,80 @@
+import pytest
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+from config import settings
+from jose import jwt
+from token_cache import TokenCache, TokenRevocationUnavailable, token_digest
+import auth
+
+class TestTokenCache:
+
+    @pytest.fixture
+    def mock_redis(self):
+
+        store = {}
+        redis_mock = AsyncMock()
+        redis_mock.exists = AsyncMock(side_effect=lambda key: int(key in store))
+        redis_mock.set = AsyncMock(side_effect=lambda key, value, ex=None: store.__setitem__(key, value))
+        redis_mock.store = store
+        return redis_mock
+
+    @pytest.fixture
+    def cache(self, mock_redis):
+
+        client_mock = MagicMock()
+        client_mock.get_client = MagicMock(return_value=mock_redis)
+        return TokenCache(redis_client_instance=client_mock, max_entries=10, enabled=True)
+
+    def test_claims_cached_until_exp(self, cache, monkeypatch):
+        exp = time.time() + 60
+        cache.set("token", {"sub": "ivan", "exp": exp})
+
+        assert cache.get("token")["sub"] == "ivan"
+
+        monkeypatch.setattr(time, "monotonic", lambda: float("inf"))
+        assert cache.get("token") is None
+        assert cache.stats()["hits"] == 1
+
+    def test_expired_token_is_not_cached(self, cache):
+        cache.set("token", {"sub": "ivan", "exp": time.time() - 1})
+
+        assert cache.get("token") is None
+
+    @pytest.mark.asyncio
+    async def test_revoke_drops_cached_claims(self, cache, mock_redis):
+        cache.set("token", {"sub": "ivan", "exp": time.time() + 60})
+
+        with patch("token_cache.cache_invalidation.publish", AsyncMock(side_effect=lambda ns, key: cache.local.invalidate(key))) as publish:
+            await cache.revoke("token", time.time() + 60)
+
+        publish.assert_awaited_once_with("token", token_digest("token"))
+        assert cache.get("token") is None
+        assert await cache.is_revoked("token") is True
+        assert await cache.is_revoked("other") is False
+
+    @pytest.mark.asyncio
+    async def test_redis_error_is_unknown(self, cache, mock_redis):
+        mock_redis.exists.side_effect = Exception("Redis connection error")
+
+        assert await cache.is_revoked("token") is None
+        assert cache.stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_revoke_fails_loudly_without_redis(self, cache, mock_redis):
+        mock_redis.set.side_effect = Exception("Redis connection error")
+
+        with pytest.raises(TokenRevocationUnavailable):
+            await cache.revoke("token", time.time() + 60)
+        assert cache.stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_decode_rejects_revoked_token(self, cache, monkeypatch):
+        monkeypatch.setattr(auth, "token_cache", cache)
+        token = jwt.encode({"sub": "ivan", "type": "access", "exp": int(time.time()) + 60}, settings.SECRET_KEY, settings.ALGORITHM)
+
+        assert (await auth.decode_token(token))["sub"] == "ivan"
+
+        with patch("token_cache.cache_invalidation.publish", AsyncMock(side_effect=lambda ns, key: cache.local.invalidate(key))):
+            await cache.revoke(token, time.time() + 60)
+
+        assert await auth.decode_token(token) is None
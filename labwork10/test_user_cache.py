@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from user_cache import UserCache
+
+class TestUserCache:
+
+    @pytest.fixture
+    def mock_redis(self):
+
+        store = {}
+        redis_mock = AsyncMock()
+        redis_mock.get = AsyncMock(side_effect=lambda key: store.get(key))
+        redis_mock.set = AsyncMock(side_effect=lambda key, value, ex=None: store.__setitem__(key, value))
+        redis_mock.delete = AsyncMock(side_effect=lambda key: store.pop(key, None))
+        redis_mock.store = store
+        return redis_mock
+
+    @pytest.fixture
+    def cache(self, mock_redis):
+
+        client_mock = MagicMock()
+        client_mock.get_client = MagicMock(return_value=mock_redis)
+        return UserCache(redis_client_instance=client_mock, ttl=30, max_entries=10, enabled=True)
+
+    @pytest.fixture
+    def load(self):
+        return AsyncMock(return_value={
+            "_id": "abc", "username": "ivan", "email": "ivan@example.com",
+            "hashed_password": "secret", "is_active": True
+        })
+
+    @pytest.mark.asyncio
+    async def test_second_lookup_skips_mongo(self, cache, load):
+        first = await cache.get_or_load("ivan", load)
+        second = await cache.get_or_load("ivan", load)
+
+        assert first == second
+        load.assert_called_once()
+        assert cache.stats()["saved_mongo_lookups"] == 1
+
+    @pytest.mark.asyncio
+    async def test_password_hash_is_not_cached(self, cache, load, mock_redis):
+        user_doc = await cache.get_or_load("ivan", load)
+
+        assert "hashed_password" not in user_doc
+        assert "secret" not in mock_redis.store["user_cache_ivan"]
+
+    @pytest.mark.asyncio
+    async def test_other_worker_hits_redis(self, cache, load, mock_redis):
+        await cache.get_or_load("ivan", load)
+        cache.local.clear()
+        await cache.get_or_load("ivan", load)
+
+        load.assert_called_once()
+        assert cache.stats()["redis_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_both_levels(self, cache, load, mock_redis):
+        await cache.get_or_load("ivan", load)
+
+        with patch("user_cache.cache_invalidation.publish", AsyncMock()) as publish:
+            await cache.invalidate("ivan")
+
+        publish.assert_awaited_once_with("user", "ivan")
+        assert "user_cache_ivan" not in mock_redis.store
+        await cache.get_or_load("ivan", load)
+        assert load.await_count == 2
@@ -0,0 +1,48 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+from write_coalescer import WriteCoalescer
+
+class TestWriteCoalescer:
+
+    @pytest.fixture
+    def flush_batch(self):
+
+        return AsyncMock(side_effect=lambda items: [item * 10 for item in items])
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_flushed_as_one_batch(self, flush_batch):
+        coalescer = WriteCoalescer(flush_batch, window_ms=20, max_batch=100)
+
+        results = await asyncio.gather(*(coalescer.submit(i) for i in range(5)))
+
+        assert results == [0, 10, 20, 30, 40]
+        flush_batch.assert_called_once_with([0, 1, 2, 3, 4])
+        assert coalescer.stats()["batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_max_batch_flushes_without_waiting_for_window(self, flush_batch):
+        coalescer = WriteCoalescer(flush_batch, window_ms=10_000, max_batch=2)
+
+        results = await asyncio.wait_for(asyncio.gather(coalescer.submit(1), coalescer.submit(2)), timeout=1)
+
+        assert results == [10, 20]
+
+    @pytest.mark.asyncio
+    async def test_errors_are_delivered_per_item(self):
+        flush_batch = AsyncMock(return_value=["ok", ValueError("duplicate")])
+        coalescer = WriteCoalescer(flush_batch, window_ms=5, max_batch=100)
+
+        results = await asyncio.gather(coalescer.submit("a"), coalescer.submit("b"), return_exceptions=True)
+
+        assert results[0] == "ok"
+        assert isinstance(results[1], ValueError)
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_fails_every_caller(self):
+        flush_batch = AsyncMock(side_effect=RuntimeError("Mongo недоступна"))
+        coalescer = WriteCoalescer(flush_batch, window_ms=5, max_batch=100)
+
+        results = await asyncio.gather(coalescer.submit("a"), coalescer.submit("b"), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,107 @@
+import hashlib
+import time
+from typing import Any, Dict, Optional
+from redis_client import redis_client
+from local_cache import LRUTTLCache
+from cache_invalidation import cache_invalidation
+from config import settings
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+class TokenRevocationUnavailable(RuntimeError):
+    pass
+
+class TokenCache:
+    """Кеш уже перевірених JWT: дайджест токена -> claims до моменту exp, щоб не
+    повторювати HMAC і розбір JSON на кожному запиті. Відкликані токени записуються
+    в Redis до свого exp; перевірка йде лише при промаху, а з локальних кешів усіх
+    воркерів токен прибирає шина інвалідації."""
+
+    def __init__(self, redis_client_instance=None, max_entries: int = None, enabled: bool = None):
+        self.redis_client_instance = redis_client_instance or redis_client
+        self.enabled = settings.TOKEN_CACHE_ENABLED if enabled is None else enabled
+        # TTL кожного запису задається за exp; загальний TTL лише верхня межа
+        self.local = LRUTTLCache(
+            max_entries or settings.TOKEN_CACHE_MAX_ENTRIES,
+            settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+        )
+        self.hits = 0
+        self.misses = 0
+        self.hit_seconds = 0.0
+        self.decodes = 0
+        self.decode_seconds = 0.0
+        self.errors = 0
+    
+    def _get_redis(self):
+        if hasattr(self.redis_client_instance, 'get_client'):
+            return self.redis_client_instance.get_client()
+        return self.redis_client_instance
+    
+    def _revoked_key(self, digest: str) -> str:
+        return f"revoked_token_{digest}"
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+
+        start = time.perf_counter()
+        claims = self.local.get(token_digest(token))
+        if claims is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.hit_seconds += time.perf_counter() - start
+        return claims
+    
+    def record_decode(self, seconds: float):
+        self.decodes += 1
+        self.decode_seconds += seconds
+    
+    async def is_revoked(self, token: str) -> Optional[bool]:
+        """None, якщо Redis недоступний: тоді токен приймаємо, але не кешуємо."""
+        try:
+            return bool(await self._get_redis().exists(self._revoked_key(token_digest(token))))
+        except Exception as e:
+            self.errors += 1
+            print(f"Token cache error: {e}")
+            return None
+    
+    def set(self, token: str, claims: Dict[str, Any], generation: Optional[int] = None):
+        ttl = claims.get("exp", 0) - time.time()
+        if self.enabled and ttl > 0:
+            self.local.set(token_digest(token), claims, ttl=ttl, generation=generation)
+    
+    async def revoke(self, token: str, exp: int):
+        digest = token_digest(token)
+        ttl = int(exp - time.time()) + 1
+        if ttl > 0:
+            try:
+                await self._get_redis().set(self._revoked_key(digest), "1", ex=ttl)
+            except Exception as e:
+                self.errors += 1
+                print(f"Token cache error: {e}")
+                raise TokenRevocationUnavailable("Не вдалося відкликати токен, спробуйте пізніше")
+        await cache_invalidation.publish("token", digest)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        avg_decode_ms = self.decode_seconds / self.decodes * 1000 if self.decodes else 0.0
+        avg_hit_ms = self.hit_seconds / self.hits * 1000 if self.hits else 0.0
+        saved_per_hit_ms = max(avg_decode_ms - avg_hit_ms, 0.0)
+        hit_rate = self.hits / lookups if lookups else 0.0
+        return {
+            "enabled": self.enabled,
+            "entries": len(self.local),
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(hit_rate, 4),
+            "avg_decode_ms": round(avg_decode_ms, 4),
+            "avg_hit_ms": round(avg_hit_ms, 4),
+            "saved_ms_per_request": round(hit_rate * saved_per_hit_ms, 4),
+            "saved_ms_total": round(self.hits * saved_per_hit_ms, 2)
+        }
+
+token_cache = TokenCache()
+cache_invalidation.register("token", token_cache.local.invalidate, token_cache.local.clear)
@@ -0,0 +1,96 @@
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional
+from redis_client import redis_client
+from local_cache import LRUTTLCache
+from cache_invalidation import cache_invalidation
+from config import settings
+
+class UserCache:
+    """Дворівневий кеш користувачів для автентифікації запитів: спершу пам'ять процесу,
+    потім Redis, і лише потім MongoDB. Хеш пароля в кеш не потрапляє."""
+
+    def __init__(self, redis_client_instance=None, ttl: int = None, max_entries: int = None, enabled: bool = None):
+        self.redis_client_instance = redis_client_instance or redis_client
+        self.ttl = ttl or settings.USER_CACHE_TTL
+        self.enabled = settings.USER_CACHE_ENABLED if enabled is None else enabled
+        self.local = LRUTTLCache(max_entries or settings.USER_CACHE_MAX_ENTRIES, self.ttl)
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.mongo_lookups = 0
+        self.errors = 0
+    
+    def _get_redis(self):
+        if hasattr(self.redis_client_instance, 'get_client'):
+            return self.redis_client_instance.get_client()
+        return self.redis_client_instance
+    
+    def _key(self, username: str) -> str:
+        return f"user_cache_{username}"
+    
+    async def get_or_load(self, username: str, load: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            self.mongo_lookups += 1
+            return await load()
+
+        user_doc = self.local.get(username)
+        if user_doc is not None:
+            self.local_hits += 1
+            return dict(user_doc)
+
+        generation = self.local.generation
+        try:
+            cached = await self._get_redis().get(self._key(username))
+        except Exception as e:
+            self.errors += 1
+            print(f"User cache error: {e}")
+            cached = None
+
+        if cached is not None:
+            self.redis_hits += 1
+            user_doc = json.loads(cached)
+            self.local.set(username, user_doc, generation=generation)
+            return dict(user_doc)
+
+        self.mongo_lookups += 1
+        user_doc = await load()
+        if user_doc is None:
+            return None
+
+        user_doc = {key: value for key, value in user_doc.items() if key != "hashed_password"}
+        user_doc["_id"] = str(user_doc["_id"])
+        if generation != self.local.generation:
+            # Поки читали з MongoDB, користувача змінили — такий документ не кешуємо
+            return user_doc
+        try:
+            await self._get_redis().set(self._key(username), json.dumps(user_doc, default=str), ex=self.ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"User cache error: {e}")
+        self.local.set(username, user_doc, generation=generation)
+        return dict(user_doc)
+    
+    async def invalidate(self, username: str):
+        self.local.invalidate(username)
+        try:
+            await self._get_redis().delete(self._key(username))
+        except Exception as e:
+            self.errors += 1
+            print(f"User cache error: {e}")
+        await cache_invalidation.publish("user", username)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.mongo_lookups
+        saved = self.local_hits + self.redis_hits
+        return {
+            "enabled": self.enabled,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "mongo_lookups": self.mongo_lookups,
+            "saved_mongo_lookups": saved,
+            "errors": self.errors,
+            "hit_rate": round(saved / lookups, 4) if lookups else 0.0,
+            "local": self.local.stats()
+        }
+
+user_cache = UserCache()
+cache_invalidation.register("user", user_cache.local.invalidate, user_cache.local.clear)
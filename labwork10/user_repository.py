@@ -2,12 +2,28 @@ from motor.motor_asyncio import AsyncIOMotorCollection
 from models import User, UserCreate
 from database import get_database
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
 from typing import Optional
-from password_utils import get_password_hash
+from password_utils import password_hasher
+from config import settings
+from user_cache import user_cache
+
+def _to_user(user_doc: dict, trusted: bool = False) -> User:
+    user_doc["_id"] = str(user_doc["_id"])
+    if trusted:
+        return User.model_construct(**user_doc)
+    return User(**user_doc)
 
 class UserRepository:
+    indexes = [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ]
+
     def __init__(self):
         self.collection_name = "users"
+        self.trusted_reads = settings.TRUSTED_READS
     
     @property
     def collection(self) -> AsyncIOMotorCollection:
@@ -24,7 +40,7 @@ class UserRepository:
         if existing_user:
             raise ValueError("Користувач з таким username або email вже існує")
 
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await password_hasher.hash(user_data.password)
 
         user_dict = {
             "username": user_data.username,
@@ -33,32 +49,60 @@ class UserRepository:
             "is_active": True
         }
         
-        result = await self.collection.insert_one(user_dict)
+        try:
+            result = await self.collection.insert_one(user_dict)
+        except DuplicateKeyError:
+            raise ValueError("Користувач з таким username або email вже існує")
 
         created_user = await self.collection.find_one({"_id": result.inserted_id})
-        created_user["_id"] = str(created_user["_id"])
-        return User(**created_user)
+        return _to_user(created_user, self.trusted_reads)
     
     async def get_user_by_username(self, username: str) -> Optional[User]:
         user_doc = await self.collection.find_one({"username": username})
         if user_doc:
-            user_doc["_id"] = str(user_doc["_id"])
-            return User(**user_doc)
+            return _to_user(user_doc, self.trusted_reads)
+        return None
+    
+    async def update_password_hash(self, username: str, old_hash: str, new_hash: str):
+        # Умова на старий хеш, щоб не перезаписати пароль, змінений паралельно
+        await self.collection.update_one(
+            {"username": username, "hashed_password": old_hash},
+            {"$set": {"hashed_password": new_hash}}
+        )
+    
+    async def get_authenticated_user(self, username: str) -> Optional[User]:
+        """Користувач для перевірки токена на кожному запиті. Читається через кеш,
+        тому hashed_password у результаті порожній — для логіну є get_user_by_username."""
+        user_doc = await user_cache.get_or_load(
+            username,
+            lambda: self.collection.find_one({"username": username})
+        )
+        if user_doc:
+            user_doc.setdefault("hashed_password", "")
+            return _to_user(user_doc, self.trusted_reads)
         return None
     
+    async def set_user_active(self, username: str, is_active: bool) -> Optional[User]:
+        result = await self.collection.update_one(
+            {"username": username},
+            {"$set": {"is_active": is_active}}
+        )
+        if result.matched_count == 0:
+            return None
+        await user_cache.invalidate(username)
+        return await self.get_user_by_username(username)
+    
     async def get_user_by_email(self, email: str) -> Optional[User]:
         user_doc = await self.collection.find_one({"email": email})
         if user_doc:
-            user_doc["_id"] = str(user_doc["_id"])
-            return User(**user_doc)
+            return _to_user(user_doc, self.trusted_reads)
         return None
     
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         try:
             user_doc = await self.collection.find_one({"_id": ObjectId(user_id)})
             if user_doc:
-                user_doc["_id"] = str(user_doc["_id"])
-                return User(**user_doc)
+                return _to_user(user_doc, self.trusted_reads)
             return None
         except:
             return None